@@ -1,124 +1,72 @@
 
 from PyQt6 import QtCore, QtGui, QtWidgets
-import xml.etree.ElementTree as ET
-import xmlschema
 import os
-from datetime import datetime
-from xml.dom import minidom
-
-class ProductXMLManager:
-    def __init__(self, xsd_file="products.xsd"):
-        self.xsd_file = xsd_file
-
-    def get_latest_xml_file(self):
-        project_dir = os.getcwd()
-        files = [f for f in os.listdir(project_dir) if f.startswith("products") and f.endswith(".xml")]
-        if not files:
-            return os.path.join(project_dir, "products.xml")
-        latest_file = max(files, key=lambda f: os.path.getmtime(os.path.join(project_dir, f)))
-        return os.path.join(project_dir, latest_file)
-
-    def validate_xml(self, xml_file):
-        if not os.path.exists(self.xsd_file):
-            print("XSD-Datei nicht gefunden. Überspringe Validierung.")
-            return True
-        schema = xmlschema.XMLSchema(self.xsd_file)
-        return schema.is_valid(xml_file)
-
-    def load_xml(self, file_path):
-        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-            print("XML-Datei nicht gefunden oder leer. Neue wird erstellt.")
-            root = ET.Element("Products", Version="1.0", Creator="Festo Didactic")
-            tree = ET.ElementTree(root)
-            tree.write(file_path, encoding="utf-8", xml_declaration=True)
-            return ET.parse(file_path)
-        try:
-            tree = ET.parse(file_path)
-            if not self.validate_xml(file_path):
-                print("Ungültige XML-Datei gemäß Schema. Neue wird erstellt.")
-                raise ET.ParseError
-            return tree
-        except ET.ParseError:
-            root = ET.Element("Products", Version="1.0", Creator="Festo Didactic")
-            tree = ET.ElementTree(root)
-            tree.write(file_path, encoding="utf-8", xml_declaration=True)
-            return ET.parse(file_path)
-
-    def product_exists(self, tree, product_name, steps):
-        root = tree.getroot()
-        for product in root.findall("Product"):
-            if product.find("ProductName") is not None and product.find("ProductName").text == product_name:
-                workplan = product.find("Workplan")
-                if workplan is not None:
-                    existing_steps = [
-                        (step.find("Function").text or "", step.find("Parameter").text or "",
-                         step.find("FunctionDescription").text or "")
-                        for step in workplan.findall("Step")
-                    ]
-                    if existing_steps == [(function, str(parameter), description) for function, parameter, description in
-                                          steps]:
-                        return True
-        return False
-
-    def add_product(self, tree, product_name, product_description, steps):
-        root = tree.getroot()
-        new_product = ET.Element("Product")
-        ET.SubElement(new_product, "ProductName").text = product_name
-        ET.SubElement(new_product, "ProductDescription").text = product_description  # Beschreibung hinzufügen
-        workplan = ET.SubElement(new_product, "Workplan")
-
-        # Anzahl existierender Schritte zählen
-        existing_steps_count = len(workplan.findall("Step"))
-        # Berechne den Startwert für die neuen Schritte
-        start_step_number = (existing_steps_count + 1) * 10
-        # Zählvariable für die Schritte
-        step_counter = 0
-
-        for step_number, (function, parameter, description) in enumerate(steps):
-            step_number = start_step_number + (step_counter * 10)  # Schrittzahl in 10er Schritten
-            step = ET.SubElement(workplan, "Step")
-            ET.SubElement(step, "Number").text = str(step_number)
-            ET.SubElement(step, "Function").text = function
-            ET.SubElement(step, "Parameter").text = str(parameter)
-            ET.SubElement(step, "FunctionDescription").text = description
-            step_counter += 1  # Erhöhe den Zähler nach jedem Schritt
-        root.append(new_product)
-        print(f"Produkt '{product_name}' wurde hinzugefügt.")
-
-    def save_xml(self, tree, file_path):
-        raw_string = ET.tostring(tree.getroot(), encoding="utf-8")
-        parsed = minidom.parseString(raw_string)
-        for element in parsed.getElementsByTagName("*"):
-            for child in list(element.childNodes):
-                if child.nodeType == child.TEXT_NODE and not child.data.strip():
-                    element.removeChild(child)
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(parsed.toprettyxml(indent="  ", newl="\n"))
-
-    def rename_file(self, file_path):
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")[:-3]
-        new_file_name = f"products-{timestamp}.xml"
-        new_file_path = os.path.join(os.path.dirname(file_path), new_file_name)
-        os.rename(file_path, new_file_path)
-        print(f"Die Datei wurde umbenannt in: {new_file_path}")
-        return new_file_path
-
-    def main(self, product_name, product_description, steps):
-        file_path = self.get_latest_xml_file()
-        tree = self.load_xml(file_path)
-
-        if self.product_exists(tree, product_name, steps):
-            print(f"Produkt '{product_name}' existiert bereits.")
+from product_xml import ProductXMLManager
+
+# Gemeinsamer Manager aller Worker: gleichzeitige Klicks werden gesammelt und unter
+# einer Dateisperre in einem Schreibvorgang gespeichert (auch mit anderen Stationen)
+catalog_manager = ProductXMLManager(group_commit=True)
+
+# Logos werden nur einmal geladen und skaliert: (Datei, Breite, Höhe) -> QPixmap
+_pixmap_cache = {}
+
+
+def load_logo(file_name, width=230, height=130):
+    """Gibt das skalierte Logo aus dem Cache zurück (None, wenn die Datei fehlt)."""
+    key = (file_name, width, height)
+    if key not in _pixmap_cache:
+        pixmap = QtGui.QPixmap(file_name)
+        if pixmap.isNull():
+            print(f"Fehler: Bild '{file_name}' konnte nicht geladen werden.")
+            _pixmap_cache[key] = None
         else:
-            self.add_product(tree, product_name, product_description, steps)
-            self.save_xml(tree, file_path)
-            new_file_path = self.rename_file(file_path)
+            _pixmap_cache[key] = pixmap.scaled(width, height, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+    return _pixmap_cache[key]
+
+### Hintergrund-Worker: Katalog schreiben ohne die Oberfläche zu blockieren
+class CatalogWorkerSignals(QtCore.QObject):
+    progress = QtCore.pyqtSignal(str, int)   # Phase, Prozent
+    finished = QtCore.pyqtSignal(str, str)   # Status ("added", "exists", "invalid"), Datei
+    error = QtCore.pyqtSignal(str)
 
-            if not self.validate_xml(new_file_path):
-                print("Warnung: Die XML-Datei entspricht nicht dem XSD-Schema!")
-            else:
-                print("XML-Datei entspricht dem XSD-Schema!")
 
+class CatalogWorker(QtCore.QRunnable):
+    def __init__(self, product_name, product_description, steps):
+        super().__init__()
+        self.product_name = product_name
+        self.product_description = product_description
+        self.steps = steps
+        self.signals = CatalogWorkerSignals()
+
+    def run(self):
+        """Läuft im QThreadPool und meldet Fortschritt und Ergebnis über Signale."""
+        try:
+            status, file_path = catalog_manager.main(self.product_name, self.product_description, self.steps,
+                                                     progress=self.signals.progress.emit)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+        self.signals.finished.emit(status, file_path or "")
+
+
+class DeployWorkerSignals(QtCore.QObject):
+    finished = QtCore.pyqtSignal(dict)      # Eintrag aus dem Deploy-Log
+    error = QtCore.pyqtSignal(str)
+
+
+class DeployWorker(QtCore.QRunnable):
+    """Übernimmt den Katalog im QThreadPool: wartet ggf. auf die Sperre anderer Stationen und kopiert die Datei."""
+    def __init__(self):
+        super().__init__()
+        self.signals = DeployWorkerSignals()
+
+    def run(self):
+        try:
+            entry = catalog_manager.deploy()
+        except (OSError, ValueError) as e:
+            self.signals.error.emit(str(e))
+            return
+        self.signals.finished.emit(entry)
 
 
 ### 2tes Window: (wenn Eingaben beim ersten Window bestätigt)
@@ -140,14 +88,11 @@ class AusgabeWindow(QtWidgets.QWidget):
         self.Label_SBSlogo.setGeometry(QtCore.QRect(220, 12, 150, 150))
         self.Label_SBSlogo.setObjectName("label_6")
 
-        # Lade das Bild und skaliere es
-        pixmap = QtGui.QPixmap("SBSlogo.jpeg")
-        if not pixmap.isNull():
-            pixmap = pixmap.scaled(230, 130, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+        # Bild aus dem gemeinsamen Cache (einmal geladen und skaliert)
+        pixmap = load_logo("SBSlogo.jpeg")
+        if pixmap is not None:
             self.Label_SBSlogo.setPixmap(pixmap)
             self.Label_SBSlogo.setScaledContents(False)
-        else:
-            print("Fehler: Bild 'SBSlogo.jpeg' konnte nicht geladen werden.")
 
 ### Logo-Quickload oben links Logo
         # Label Logo QuickLoad
@@ -155,16 +100,13 @@ class AusgabeWindow(QtWidgets.QWidget):
         self.Label_QuickLoad.setGeometry(QtCore.QRect(12, 12, 150, 150))
         self.Label_QuickLoad.setObjectName("label_7")
 
-        # Lade das Bild und skaliere es
-        pixmap = QtGui.QPixmap("QuickLoad.jpg")
-        if not pixmap.isNull():
-            pixmap = pixmap.scaled(230, 130, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+        # Bild aus dem gemeinsamen Cache (einmal geladen und skaliert)
+        pixmap = load_logo("QuickLoad.jpg")
+        if pixmap is not None:
             self.Label_QuickLoad.setPixmap(pixmap)
             self.Label_QuickLoad.setScaledContents(False)
-        else:
-            print("Fehler: Bild 'QuickLoad.jpg' konnte nicht geladen werden.")
 
-### Schriftzug (mitte) erst nach ablauf progressbar(Ladezeile) sichtbar
+### Schriftzug (mitte) erst sichtbar, wenn die Datei geschrieben und geprüft ist
         # Label für das neue Fenster
         self.label = QtWidgets.QLabel("Das Produkt wurde erfolgreich erstellt!", self)
         self.label.setGeometry(150, 200, 1100, 100)  # Label positionieren und Größe festlegen
@@ -184,23 +126,23 @@ class AusgabeWindow(QtWidgets.QWidget):
         self.backButton.setGeometry(500, 720, 400, 40)
         self.backButton.clicked.connect(self.on_back_button_clicked)
 
-### Ladezeile (mitte) läuft nach öffnen dieses Windows durch
+### Übernehmen-Button (unten): nur wenn ein Zielordner (QUICKLOAD_DEPLOY_DIR) eingestellt ist
+        self.deployButton = QtWidgets.QPushButton("In MiniMES übernehmen", self)
+        self.deployButton.setGeometry(500, 672, 400, 40)
+        self.deployButton.clicked.connect(self.on_deploy_button_clicked)
+        self.deployButton.setVisible(bool(catalog_manager.deploy_dir))
+        self.deployButton.setEnabled(False)
+
+### Ladezeile (mitte) zeigt den echten Fortschritt des CatalogWorker
         # ProgressBar hinzufügen
         self.progressBar = QtWidgets.QProgressBar(self)
         self.progressBar.setGeometry(QtCore.QRect(480, 300, 500, 60))
         self.progressBar.setMaximum(100)  # Maximaler Wert 100%
         self.progressBar.setValue(0)      # Startwert 0%
 
-        # ProgressBar Einstellungen (in Millisekunden)
-        self.progress_duration = 1600  # Gesamtzeit für den Fortschritt (z.B. 5000 ms = 5 Sekunden)
-        self.progress_speed = 13      # Zeit in ms für jedes Schritt der ProgressBar (50ms für jedes Inkrement)
-
-        # Timer
-        self.progress_timer = QtCore.QTimer(self)
-        self.progress_timer.timeout.connect(self.update_progress_bar)
-
-        # Den Timer direkt beim Erstellen starten
-        self.start_progress_bar()
+        # Während der Katalog geschrieben wird, kann nicht zurückgegangen werden
+        self.backButton.setEnabled(False)
+        self.file_name = None
 
         # Texte basierend auf der ausgewählten Sprache festlegen
         self.set_language_text()
@@ -212,31 +154,74 @@ class AusgabeWindow(QtWidgets.QWidget):
         language = self.main_window.get_selected_language()  # Beispielmethode, um die ausgewählte Sprache zu holen
 
         if language == 'de':  # Deutsch
+            file_name = self.file_name or "products-2025-05-02_13-32-01-845.xml (beispielhafte XML-Datei)"
             self.setWindowTitle("Produkt Ausgeben")
             self.label.setText("Das Produkt wurde erfolgreich erstellt!")
             self.textBrowser.setText(
-                "Die Datei: products-2025-05-02_13-32-01-845.xml (beispielhafte XML-Datei) müssen Sie in die Industrie 4.0 Anlage einpflegen. \n"
+                f"Die Datei: {file_name} müssen Sie in die Industrie 4.0 Anlage einpflegen. \n"
                 "\n"
                 "Bei der Industrie 4.0 Anlage müssen Sie in den Ordner MPS203-|40, Dokumente, MPS_MiniMES, Settings gehen. \n"
                 "\n"
-                "Die aktuelle products-Datei nun löschen. Die erwünschte products-2025-05-02_13-32-01-845.xml (beispielhafte XML-Datei) dem Ordner hinzufügen und in 'products' umbennenen.\n"
+                f"Die aktuelle products-Datei nun löschen. Die erwünschte {file_name} dem Ordner hinzufügen und in 'products' umbennenen.\n"
                 "\n"
                 "Danach können Sie die neuen Produkte im System der Industrie 4.0 Anlage sehen."
             )
             self.backButton.setText("Zurück zum Hauptfenster")
+            self.deployButton.setText("In MiniMES übernehmen")
         else:  # Fallback auf Englisch
+            file_name = self.file_name or "products-2025-05-02_13-32-01-845.xml (sample XML file)"
             self.setWindowTitle("Product Output")
             self.label.setText("The product has been successfully created!")
             self.textBrowser.setText(
-                "You need to import the file products-2025-05-02_13-32-01-845.xml (sample XML file) into the Industry 4.0 system. \n"
+                f"You need to import the file {file_name} into the Industry 4.0 system. \n"
                 "\n"
                 "To do this, navigate to the following folder within the Industry 4.0 system: MPS203-|40, Dokumente, MPS_MiniMES, Settings. \n"
                 "\n"
-                "Delete the current products file in this folder. Then add the desired products-2025-05-02_13-32-01-845.xml (sample XML file) to the folder and rename it to products.\n"
+                f"Delete the current products file in this folder. Then add the desired {file_name} to the folder and rename it to products.\n"
                 "\n"
                 "Afterwards, the new products will be visible in the Industry 4.0 system."
             )
             self.backButton.setText("Back to Main Window")
+            self.deployButton.setText("Publish to MiniMES")
+
+    def reset(self):
+        """Setzt das Fenster für das nächste Produkt zurück, statt es neu aufzubauen."""
+        self.language = self.main_window.get_selected_language()
+        self.file_name = None
+        self.progressBar.setValue(0)
+        self.progressBar.resetFormat()
+        self.progressBar.setVisible(True)
+        self.backButton.setEnabled(False)
+        self.deployButton.setEnabled(False)
+        self.label.setStyleSheet("font-size: 30px; color: transparent; background-color: white;")
+        self.set_language_text()
+
+    def on_deploy_button_clicked(self):
+        """Kopiert den aktuellen Stand als products.xml in den Settings-Ordner der MiniMES-Software."""
+        # Im Hintergrund, damit die Oberfläche beim Warten auf die Sperre oder beim Kopieren nicht hängt
+        self.deployButton.setEnabled(False)
+        self.backButton.setEnabled(False)
+        self.deploy_worker = DeployWorker()
+        self.deploy_worker.signals.finished.connect(self.on_deploy_finished)
+        self.deploy_worker.signals.error.connect(self.on_deploy_error)
+        QtCore.QThreadPool.globalInstance().start(self.deploy_worker)
+
+    def on_deploy_finished(self, entry):
+        self.deployButton.setEnabled(True)
+        self.backButton.setEnabled(True)
+        german = self.main_window.get_selected_language() == 'de'
+        if entry["status"] == "unchanged":
+            self.textBrowser.setText(f"{entry['target']} ist bereits aktuell." if german
+                                     else f"{entry['target']} is already up to date.")
+        else:
+            self.textBrowser.setText(f"{entry['source']} wurde als {entry['target']} übernommen." if german
+                                     else f"{entry['source']} was published as {entry['target']}.")
+
+    def on_deploy_error(self, message):
+        self.deployButton.setEnabled(True)
+        self.backButton.setEnabled(True)
+        german = self.main_window.get_selected_language() == 'de'
+        self.textBrowser.setText(("Übernahme fehlgeschlagen: " if german else "Publishing failed: ") + message)
 
     def on_back_button_clicked(self):
         """Wird ausgeführt, wenn der 'Zurück'-Button gedrückt wird."""
@@ -249,23 +234,39 @@ class AusgabeWindow(QtWidgets.QWidget):
         # Zeige das MainWindow erneut
         self.main_window.show()
 
-### Ladezeile start
-    def start_progress_bar(self):
-        """Startet die ProgressBar und setzt den Timer"""
-        self.progressBar.setValue(0)      # Setze den Fortschritt auf 0
-        self.progress_timer.start(self.progress_speed)  # Timer mit der festgelegten Geschwindigkeit starten
-
-    def update_progress_bar(self):
-        """Aktualisiert die Fortschrittsanzeige"""
-        current_value = self.progressBar.value()
-        if current_value < 100:
-            self.progressBar.setValue(current_value + 1)  # Erhöhe den Fortschritt
-        else:
-            self.progress_timer.stop()  # Stoppe den Timer, wenn 100 erreicht wurde
-            self.progressBar.setVisible(False)  # Mache die ProgressBar unsichtbar
+### Ladezeile: Fortschritt und Ergebnis kommen vom CatalogWorker
+    def on_progress(self, phase, value):
+        """Zeigt die aktuelle Phase (laden, prüfen, speichern, ...) und den Fortschritt an."""
+        self.progressBar.setValue(value)
+        self.progressBar.setFormat(f"{phase} %p%")
+
+    def on_finished(self, status, file_path):
+        """Wird aufgerufen, wenn die Datei geschrieben und geprüft wurde."""
+        self.progressBar.setVisible(False)  # Mache die ProgressBar unsichtbar
+        self.backButton.setEnabled(True)
+        self.deployButton.setEnabled(status != "invalid")
+        if file_path:
+            self.file_name = os.path.basename(file_path)
+        self.set_language_text()
 
+        german = self.main_window.get_selected_language() == 'de'
+        if status == "added":
             # Ändere die Schriftfarbe des Labels zu grün
             self.label.setStyleSheet("font-size: 30px; color: green; background-color: white;")
+        elif status == "exists":
+            self.label.setText("Das Produkt existiert bereits!" if german else "The product already exists!")
+            self.label.setStyleSheet("font-size: 30px; color: orange; background-color: white;")
+        else:
+            self.label.setText("Die XML-Datei entspricht nicht dem XSD-Schema!" if german
+                               else "The XML file does not match the XSD schema!")
+            self.label.setStyleSheet("font-size: 30px; color: red; background-color: white;")
+
+    def on_error(self, message):
+        self.progressBar.setVisible(False)
+        self.backButton.setEnabled(True)
+        german = self.main_window.get_selected_language() == 'de'
+        self.label.setText(("Fehler beim Speichern: " if german else "Error while saving: ") + message)
+        self.label.setStyleSheet("font-size: 30px; color: red; background-color: white;")
 
 
 ### Hauptfenster (Start Window)
@@ -369,6 +370,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self.languageComboBox.addItem("English")
         self.languageComboBox.currentIndexChanged.connect(self.change_language)
 
+        # Ausgabefenster, wird beim ersten "Produkt ausgeben" erzeugt und wiederverwendet
+        self.newWindow = None
+
         # Initialisierung der GUI-Komponenten
         self.setup_ui()
         self.apply_translations()
@@ -453,14 +457,11 @@ class MainWindow(QtWidgets.QMainWindow):
         self.Label_SBSlogo.setGeometry(QtCore.QRect(220, 12, 150, 150))
         self.Label_SBSlogo.setObjectName("label_6")
 
-        # Lade das Bild und skaliere es
-        pixmap = QtGui.QPixmap("SBSlogo.jpeg")
-        if not pixmap.isNull():
-            pixmap = pixmap.scaled(230, 130, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+        # Bild aus dem gemeinsamen Cache (einmal geladen und skaliert)
+        pixmap = load_logo("SBSlogo.jpeg")
+        if pixmap is not None:
             self.Label_SBSlogo.setPixmap(pixmap)
             self.Label_SBSlogo.setScaledContents(False)
-        else:
-            print("Fehler: Bild 'SBSlogo.jpeg' konnte nicht geladen werden.")
 
 ### Logo-Quickload oben links Logo
         # Label Logo QuickLoad
@@ -468,14 +469,11 @@ class MainWindow(QtWidgets.QMainWindow):
         self.Label_QuickLoad.setGeometry(QtCore.QRect(12, 12, 150, 150))
         self.Label_QuickLoad.setObjectName("label_7")
 
-        # Lade das Bild und skaliere es
-        pixmap = QtGui.QPixmap("QuickLoad.jpg")
-        if not pixmap.isNull():
-            pixmap = pixmap.scaled(230, 130, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+        # Bild aus dem gemeinsamen Cache (einmal geladen und skaliert)
+        pixmap = load_logo("QuickLoad.jpg")
+        if pixmap is not None:
             self.Label_QuickLoad.setPixmap(pixmap)
             self.Label_QuickLoad.setScaledContents(False)
-        else:
-            print("Fehler: Bild 'QuickLoad.jpg' konnte nicht geladen werden.")
 
 ### Eingabekästchen für Produkt name
         # LineEdit
@@ -527,13 +525,21 @@ class MainWindow(QtWidgets.QMainWindow):
         self.comboBox_distribution.addItem("internationaler Vertrieb") # international distribution
 
 ### Textzfeld (unten) die eingegebenen, ausgewählten Werte darstellen in der ausgewählten Sprache
-        # Verbinde das TextChanged-Signal des lineEdit mit der Funktion
-        self.lineEdit.textChanged.connect(self.update_textBrowser)
-        self.textEdit.textChanged.connect(self.update_textBrowser)
-        self.comboBox_distribution.currentTextChanged.connect(self.update_textBrowser)
-        self.comboBox_workpiece.currentTextChanged.connect(self.update_textBrowser)
-        self.comboBox_mountCap.currentTextChanged.connect(self.update_textBrowser)
-        self.comboBox_checkColour.currentTextChanged.connect(self.update_textBrowser)
+        # Jede Änderung merkt nur das Feld vor; der Timer löst nach einer kurzen Pause
+        # genau eine Aktualisierung für alle gesammelten Änderungen aus
+        self.preview_values = {}
+        self.preview_text = ""
+        self.dirty_fields = set()
+        self.preview_timer = QtCore.QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(150)
+        self.preview_timer.timeout.connect(self.update_textBrowser)
+        self.lineEdit.textChanged.connect(lambda *_: self.schedule_preview("name"))
+        self.textEdit.textChanged.connect(lambda *_: self.schedule_preview("beschreibung"))
+        self.comboBox_distribution.currentTextChanged.connect(lambda *_: self.schedule_preview("distribution"))
+        self.comboBox_workpiece.currentTextChanged.connect(lambda *_: self.schedule_preview("workpiece"))
+        self.comboBox_mountCap.currentTextChanged.connect(lambda *_: self.schedule_preview("mountCap"))
+        self.comboBox_checkColour.currentTextChanged.connect(lambda *_: self.schedule_preview("checkColour"))
 
 ### Rote linien unter nicht ausgefüllten Eingaben/Auswahl bei Weiter(Produkt fertig) klickt
         # Rote Linie Produktname
@@ -567,6 +573,17 @@ class MainWindow(QtWidgets.QMainWindow):
         self.line_red_checkColour.setStyleSheet("background-color: red;")
         self.line_red_checkColour.setVisible(False)  # Zunächst nicht sichtbar
 
+        # Feld der Vorschau -> (aktuellen Wert lesen, rote Linie)
+        self.preview_fields = {
+            "name": (lambda: self.lineEdit.text().strip(), self.line_red_Produktname),
+            "beschreibung": (lambda: self.textEdit.toPlainText().strip(), self.line_red_Produktbeschreibung),
+            "workpiece": (self.comboBox_workpiece.currentText, self.line_red_workpiece),
+            "mountCap": (self.comboBox_mountCap.currentText, self.line_red_mountCap),
+            "checkColour": (self.comboBox_checkColour.currentText, self.line_red_checkColour),
+            "distribution": (self.comboBox_distribution.currentText, self.line_red_distributation),
+        }
+        self.dirty_fields.update(self.preview_fields)
+
     ### Sprach änderung (Deutsch, Englisch)
     def change_language(self):
         """Wechselt die Sprache der Anwendung."""
@@ -613,6 +630,12 @@ class MainWindow(QtWidgets.QMainWindow):
             t["combo_auswählen"], t["combo_vertrieb_national"], t["combo_vertrieb_international"]
         ])
 
+        # Schriftfarben nur einmal setzen, wenn die Einträge neu befüllt wurden
+        self.set_combobox_color(self.comboBox_workpiece)
+        self.set_combobox_color(self.comboBox_mountCap)
+        self.set_combobox_color(self.comboBox_checkColour)
+        self.set_combobox_color(self.comboBox_distribution)
+
 ### Hauptwindow zurücksetzten wenn Produktauswahl abgeschlossen ist (in Start zustand)
     def reset_main_window(self):
         """Setzt alle Felder und Widgets im MainWindow zurück."""
@@ -631,6 +654,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
         # Optional: Setze den Text im TextBrowser zurück
         self.textBrowser.clear()
+        self.preview_text = ""
 
         # Stelle sicher, dass alle Eingabefelder wieder aktiviert sind
         widgets_to_enable = [
@@ -655,16 +679,34 @@ class MainWindow(QtWidgets.QMainWindow):
         self.pushButtonProduktAusgeben.setStyleSheet(f"background-color: {ausgeben_color};")
 
 ### In das Textfeld (unten) die eingegebenen, ausgewählten Werte darstellen in der ausgewählten Sprache
+    def schedule_preview(self, field):
+        """Merkt das geänderte Feld vor und startet den Timer für die Vorschau (neu)."""
+        self.dirty_fields.add(field)
+        self.preview_timer.start()
+
+    def flush_preview(self):
+        """Führt eine ausstehende Aktualisierung sofort aus (z.B. vor 'Produkt fertig')."""
+        self.preview_timer.stop()
+        self.update_textBrowser()
+
     def update_textBrowser(self):
-        """Aktualisiert den Inhalt des TextBrowsers mit den aktuellen Werten."""
-        name = self.lineEdit.text().strip()
-        beschreibung = self.textEdit.toPlainText().strip()
+        """Aktualisiert den Inhalt des TextBrowsers; gelesen werden nur die geänderten Felder."""
+        if not self.dirty_fields:
+            return
+        changed = set(self.dirty_fields)
+        self.dirty_fields.clear()
+        for field in changed:
+            read, _ = self.preview_fields[field]
+            self.preview_values[field] = read()
+
+        name = self.preview_values["name"]
+        beschreibung = self.preview_values["beschreibung"]
 
         # Hole die aktuellen ComboBox-Werte
-        workpiece = self.comboBox_workpiece.currentText()
-        mountCap = self.comboBox_mountCap.currentText()
-        checkColour = self.comboBox_checkColour.currentText()
-        distribution = self.comboBox_distribution.currentText()
+        workpiece = self.preview_values["workpiece"]
+        mountCap = self.preview_values["mountCap"]
+        checkColour = self.preview_values["checkColour"]
+        distribution = self.preview_values["distribution"]
 
         # Definiere Platzhalterwerte, die ignoriert werden sollen
         placeholders = {"auswählen", "-", "select"}
@@ -688,17 +730,14 @@ class MainWindow(QtWidgets.QMainWindow):
             display_text.append(f"\n ")
             display_text.append(f"\n{beschreibung}")
 
-        # Setze den Text im TextBrowser
-        self.textBrowser.setText("".join(display_text))
+        # Setze den Text im TextBrowser (nur wenn er sich geändert hat)
+        text = "".join(display_text)
+        if text != self.preview_text:
+            self.preview_text = text
+            self.textBrowser.setText(text)
 
-        # Setze die Schriftfarbe der ComboBoxes
-        self.set_combobox_color(self.comboBox_workpiece)
-        self.set_combobox_color(self.comboBox_mountCap)
-        self.set_combobox_color(self.comboBox_checkColour)
-        self.set_combobox_color(self.comboBox_distribution)
-
-        # Sichtbarkeit der roten Linien basierend auf Eingabewerten aktualisieren
-        self.update_error_lines()
+        # Sichtbarkeit der roten Linien nur für die geänderten Felder aktualisieren
+        self.update_error_lines(changed)
 
 ### Funktion: Rote linien unter nicht ausgefüllten Eingaben/Auswahl bei Weiter(Produkt fertig) klickt
     def set_combobox_color(self, comboBox):
@@ -712,30 +751,24 @@ class MainWindow(QtWidgets.QMainWindow):
             else:
                 comboBox.setItemData(index, QtGui.QColor("black"), QtCore.Qt.ItemDataRole.ForegroundRole)  # Setzt die Schriftfarbe auf schwarz
 
-    def update_error_lines(self):
-        """Aktualisiert die Sichtbarkeit der roten Linien."""
+    def update_error_lines(self, fields=None):
+        """Aktualisiert die Sichtbarkeit der roten Linien (Standard: für alle Felder)."""
         unselected_texts = ["auswählen", "select"]  # Füge hier weitere Sprachen hinzu, falls nötig
 
-        # Sichtbarkeit der roten Linien basierend auf den Eingabewerten steuern
-        if self.lineEdit.text().strip() != "":
-            self.line_red_Produktname.setVisible(False)  # Unsichtbar machen, wenn gültig
-
-        if self.textEdit.toPlainText().strip() != "":
-            self.line_red_Produktbeschreibung.setVisible(False)  # Unsichtbar machen, wenn gültig
-
-        if self.comboBox_workpiece.currentText().strip().lower() not in unselected_texts:
-            self.line_red_workpiece.setVisible(False)  # Unsichtbar machen, wenn gültig
-
-        if self.comboBox_distribution.currentText().strip().lower() not in unselected_texts:
-            self.line_red_distributation.setVisible(False)  # Unsichtbar machen, wenn gültig
-
-        if self.comboBox_mountCap.currentText().strip().lower() not in unselected_texts:
-            self.line_red_mountCap.setVisible(False)  # Unsichtbar machen, wenn gültig
-
-        if self.comboBox_checkColour.currentText().strip().lower() not in unselected_texts:
-            self.line_red_checkColour.setVisible(False)  # Unsichtbar machen, wenn gültig
+        for field in fields or self.preview_fields:
+            read, line = self.preview_fields[field]
+            value = self.preview_values[field] if field in self.preview_values else read()
+            if field in ("name", "beschreibung"):
+                valid = value != ""
+            else:
+                valid = value.strip().lower() not in unselected_texts
+            if valid:
+                line.setVisible(False)  # Unsichtbar machen, wenn gültig
 
     def on_pushButtonProduktFertig_clicked(self):
+        # Ausstehende Änderungen sofort in die Vorschau übernehmen
+        self.flush_preview()
+
         # Texte, die "auswählen" bedeuten, in verschiedenen Sprachen
         unselected_texts = ["auswählen", "select"]  # Füge hier weitere Sprachen hinzu, falls nötig
 
@@ -892,16 +925,21 @@ class MainWindow(QtWidgets.QMainWindow):
         if distribution and distribution != "-":  # Nur hinzufügen, wenn distribution nicht leer ist und nicht ein '-'
             steps.append((f"{dist_id}", 1, f"{dist}"))
 
-        # Instanziiere den ProductXMLManager
-        manager = ProductXMLManager()
-
-        # Übergabe der Werte an die main-Methode
-        manager.main(name, beschreibung, steps)  # Übergebe die Werte an die main-Methode
-
-        # Öffne das neue Fenster (AusgabeWindow) und übergebe das MainWindow
-        self.newWindow = AusgabeWindow(self)  # MainWindow wird übergeben
+        # Das AusgabeWindow wird nur beim ersten Mal erzeugt und danach zurückgesetzt
+        if self.newWindow is None:
+            self.newWindow = AusgabeWindow(self)  # MainWindow wird übergeben
+        else:
+            self.newWindow.reset()
         self.newWindow.showFullScreen()  # Zeigt das Fenster im Vollbildmodus
 
+        # Katalog im Hintergrund schreiben, das AusgabeWindow zeigt den echten Fortschritt
+        self.pushButtonProduktAusgeben.setEnabled(False)
+        self.worker = CatalogWorker(name, beschreibung, steps)
+        self.worker.signals.progress.connect(self.newWindow.on_progress)
+        self.worker.signals.finished.connect(self.newWindow.on_finished)
+        self.worker.signals.error.connect(self.newWindow.on_error)
+        QtCore.QThreadPool.globalInstance().start(self.worker)
+
 if __name__ == "__main__":
     import sys
     app = QtWidgets.QApplication(sys.argv)
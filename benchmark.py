@@ -0,0 +1,200 @@
+"""Benchmark für ProductXMLManager mit synthetischen Katalogen (ohne PyQt6).
+
+Erzeugt Kataloge aus dem echten Schritt-Vokabular (RR/RB/RS, MC, CC, SN/SI), misst
+jede Phase (load_xml, validate_xml, product_exists, add_product, save_xml,
+rename_file) sowie den kompletten main()-Ablauf und den Spitzenspeicher.
+Die Ergebnisse werden als JSON gespeichert und können mit einer Baseline verglichen
+werden; Verschlechterungen über der Toleranz beenden das Programm mit Exit-Code 1.
+Standardmäßig laufen nur Größen bis 10000 Produkte; die großen Kataloge (bis zu einer
+Million Produkte, mehrere GB Speicher und Minuten Laufzeit) nur mit --large.
+
+Beispiele:
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --tolerance 0.25
+    python benchmark.py --large --output bench-large.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from product_xml import FUNCTION_DESCRIPTIONS, ProductXMLManager
+from product_catalog import ProductCatalog
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+LARGE_SIZES = [100000, 1000000]
+XSD_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "products.xsd")
+
+# Beim Baseline-Vergleich gelten Phasen unter NOISE_FLOOR als Messrauschen; eine
+# Verschlechterung muss außerdem mindestens MIN_REGRESSION Sekunden betragen, damit
+# Schwankungen des Rechners (Scheduler, Plattencache) keinen Fehlalarm auslösen
+NOISE_FLOOR = 0.010
+MIN_REGRESSION = 0.005
+
+
+def random_steps(rng):
+    """Zufälliger, aber realistischer Arbeitsplan: Werkstück, optional Kappe/Kontrolle, Vertrieb."""
+    codes = [rng.choice(["RR", "RB", "RS"])]
+    if rng.random() < 0.6:
+        codes.append("MC")
+    if rng.random() < 0.4:
+        codes.append("CC")
+    codes.append(rng.choice(["SN", "SI"]))
+    return [(code, 1, FUNCTION_DESCRIPTIONS[code]) for code in codes]
+
+
+def generate_catalog(file_path, size, seed=0):
+    """Schreibt einen Katalog mit size Produkten nach file_path."""
+    rng = random.Random(seed)
+    catalog = ProductCatalog()
+    for number in range(size):
+        catalog.add_product(f"Variante {number}", f"Generierte Produktvariante Nr. {number}", random_steps(rng))
+    with open(file_path, "w", encoding="utf-8") as f:
+        catalog.write_xml(f)
+
+
+def timed(function, repeat):
+    """Führt function repeat-mal aus und gibt die kürzeste Laufzeit in Sekunden zurück."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_size(size, repeat, work_dir):
+    file_path = os.path.join(work_dir, "products.xml")
+    shutil.copy(XSD_FILE, os.path.join(work_dir, "products.xsd"))
+    generate_catalog(file_path, size)
+    manager = ProductXMLManager(xsd_file=os.path.join(work_dir, "products.xsd"))
+    new_steps = [("RS", 1, FUNCTION_DESCRIPTIONS["RS"]), ("SI", 1, FUNCTION_DESCRIPTIONS["SI"])]
+
+    result = {"size": size, "file_bytes": os.path.getsize(file_path), "phases": {}}
+    phases = result["phases"]
+    phases["load_xml"] = timed(lambda: manager.load_xml(file_path), repeat)
+    tree = manager.load_xml(file_path)
+    phases["validate_xml"] = timed(lambda: manager.validate_xml(tree), repeat)
+    # Erster Aufruf baut den Index auf, danach wird nur noch nachgeschlagen
+    phases["build_index"] = timed(lambda: manager.build_index(tree), repeat)
+    phases["product_exists"] = timed(lambda: manager.product_exists(tree, "Neu", new_steps), repeat)
+    phases["add_product"] = timed(lambda: manager.add_product(tree, "Neu", "neu", new_steps, verbose=False), repeat)
+    save_path = os.path.join(work_dir, "products-save.xml")
+
+    def save():
+        # Unveränderte Inhalte würden sonst nicht erneut geschrieben
+        if os.path.exists(save_path):
+            os.remove(save_path)
+        manager.save_xml(tree, save_path)
+    phases["save_xml"] = timed(save, repeat)
+    os.remove(save_path)
+
+    rename_dir = os.path.join(work_dir, "rename")
+    os.makedirs(rename_dir)
+    state = {"path": os.path.join(rename_dir, "products.xml")}
+    shutil.copy(file_path, state["path"])
+
+    def rename():
+        state["path"] = manager.rename_file(state["path"])
+    phases["rename_file"] = timed(rename, repeat)
+    shutil.rmtree(rename_dir)
+
+    # Kompletter Ablauf wie beim Klick auf "Produkt ausgeben", einmal mit Speichermessung
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        start = time.perf_counter()
+        manager.main("Ende-zu-Ende", "Benchmark", new_steps)
+        phases["main"] = time.perf_counter() - start
+        tracemalloc.start()
+        manager.main("Ende-zu-Ende 2", "Benchmark", new_steps)
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        os.chdir(cwd)
+    return result
+
+
+def run(sizes, repeat):
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "sizes": [],
+    }
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix="quickload-bench-") as work_dir:
+            # Statusausgaben von ProductXMLManager unterdrücken
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = bench_size(size, repeat, work_dir)
+        results["sizes"].append(result)
+        phases = "  ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in result["phases"].items())
+        print(f"{size:>8} Produkte  {phases}  Peak {result['peak_memory_bytes'] / 1e6:.1f} MB")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Vergleicht mit einer Baseline und gibt die Liste der Verschlechterungen zurück."""
+    regressions = []
+    base_sizes = {entry["size"]: entry for entry in baseline.get("sizes", [])}
+    for entry in results["sizes"]:
+        base = base_sizes.get(entry["size"])
+        if base is None:
+            continue
+        for name, seconds in entry["phases"].items():
+            base_seconds = base["phases"].get(name)
+            if base_seconds is None or max(seconds, base_seconds) < NOISE_FLOOR:
+                continue
+            if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > MIN_REGRESSION:
+                regressions.append(f"{entry['size']} Produkte, {name}: {base_seconds * 1000:.1f}ms -> {seconds * 1000:.1f}ms")
+        base_peak = base.get("peak_memory_bytes")
+        if base_peak and entry["peak_memory_bytes"] > base_peak * (1 + tolerance):
+            regressions.append(f"{entry['size']} Produkte, Peak-Speicher: {base_peak} -> {entry['peak_memory_bytes']} Bytes")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark für ProductXMLManager")
+    parser.add_argument("--sizes", help="Katalog-Größen, kommagetrennt (Standard: 10 bis 10000)")
+    parser.add_argument("--large", action="store_true",
+                        help=f"Zusätzlich die großen Kataloge messen ({', '.join(str(size) for size in LARGE_SIZES)})")
+    parser.add_argument("--repeat", type=int, default=5, help="Wiederholungen pro Phase (Minimum zählt)")
+    parser.add_argument("--output", help="Ergebnisse als JSON speichern")
+    parser.add_argument("--baseline", help="JSON einer früheren Messung zum Vergleich")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Erlaubte Verschlechterung (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")] if args.sizes else list(DEFAULT_SIZES)
+    if args.large:
+        sizes += [size for size in LARGE_SIZES if size not in sizes]
+    results = run(sizes, args.repeat)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Ergebnisse gespeichert: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("VERSCHLECHTERUNG gegenüber der Baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("Keine Verschlechterung gegenüber der Baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
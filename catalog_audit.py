@@ -0,0 +1,64 @@
+"""Prüfung aller Katalogdateien eines Verzeichnisses auf mehreren Prozessorkernen.
+
+Jeder Worker-Prozess kompiliert das XSD-Schema genau einmal (Initializer) und
+prüft danach beliebig viele Dateien. Pro Datei wird einmal geparst; der Baum wird
+gegen das Schema geprüft und auf doppelte Produktnamen und leere Arbeitspläne
+durchsucht.
+"""
+import os
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+from product_xml import ProductXMLManager, get_compiled_schema
+
+# ProductXMLManager des Worker-Prozesses, wird von _init_worker angelegt
+_worker_manager = None
+
+
+def _init_worker(xsd_file):
+    global _worker_manager
+    _worker_manager = ProductXMLManager(xsd_file=xsd_file)
+    if os.path.exists(xsd_file):
+        get_compiled_schema(xsd_file)
+
+
+def find_catalog_files(project_dir=None):
+    """Alle products*.xml Dateien im Verzeichnis, sortiert nach Namen."""
+    project_dir = project_dir or os.getcwd()
+    return sorted(os.path.join(project_dir, f) for f in os.listdir(project_dir)
+                  if f.startswith("products") and f.endswith(".xml"))
+
+
+def audit_file(file_path):
+    """Prüft eine Datei und gibt das Ergebnis als Dict zurück (muss im Worker laufen)."""
+    result = {"file": file_path, "valid": False, "error": None, "products": 0,
+              "duplicates": [], "empty_workplans": []}
+    try:
+        tree = ET.parse(file_path)
+    except (ET.ParseError, OSError) as e:
+        result["error"] = str(e)
+        return result
+    result["valid"] = _worker_manager.validate_xml(tree)
+
+    seen = set()
+    duplicates = set()
+    for product in tree.getroot().findall("Product"):
+        name = product.findtext("ProductName") or ""
+        if name in seen:
+            duplicates.add(name)
+        seen.add(name)
+        if product.find("Workplan/Step") is None:
+            result["empty_workplans"].append(name)
+        result["products"] += 1
+    result["duplicates"] = sorted(duplicates)
+    return result
+
+
+def audit_files(files, xsd_file="products.xsd", workers=None):
+    """Prüft files parallel (workers=None: ein Prozess pro Kern) und gibt die Ergebnisse in gleicher Reihenfolge zurück."""
+    xsd_file = os.path.abspath(xsd_file)
+    if workers == 1 or len(files) <= 1:
+        _init_worker(xsd_file)
+        return [audit_file(file_path) for file_path in files]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(xsd_file,)) as executor:
+        return list(executor.map(audit_file, files))
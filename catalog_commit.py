@@ -0,0 +1,176 @@
+"""Sicheres Schreiben des Katalogs, wenn mehrere Stationen dasselbe Verzeichnis nutzen.
+
+Laden, Ändern, Speichern und Umbenennen des Heads laufen unter einer Dateisperre
+(products.lock im Katalogverzeichnis, fcntl bzw. msvcrt), sonst gehen bei zwei
+gleichzeitigen Klicks Produkte verloren oder die Snapshot-Kette verzweigt sich.
+
+Der GroupCommitter sammelt Produkte, die während eines laufenden Schreibvorgangs
+eintreffen - auch von anderen Stationen -, und schreibt sie danach gemeinsam mit
+einem einzigen Laden/Speichern.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+LOCK_FILE = "products.lock"
+# Noch nicht geschriebene Produkte und Ergebnisse für andere Prozesse
+PENDING_DIR = "products-pending"
+
+
+@contextmanager
+def file_lock(lock_path):
+    """Exklusive, beratende Sperre auf lock_path; wartet, bis die Sperre frei ist."""
+    with open(lock_path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gibt nach ca. 10 Sekunden auf, dann erneut versuchen
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class GroupCommitter:
+    """Schreibt gleichzeitig eintreffende Produkte aller Stationen gesammelt über commit_batch.
+
+    Jedes Produkt wird zuerst als Datei in products-pending/ (im Katalogverzeichnis)
+    abgelegt, danach wird auf die Katalogsperre gewartet. Wer die Sperre bekommt, schreibt
+    alle bis dahin abgelegten Produkte - auch die anderer Prozesse - mit einem einzigen
+    Laden/Speichern und hinterlegt für jedes das Ergebnis. Findet ein Prozess nach dem
+    Warten sein Ergebnis schon vor, ist er fertig, ohne den Katalog anzufassen.
+
+    Scheitert ein Stapel, werden seine Produkte einzeln geschrieben; ein Produkt, das auch
+    allein scheitert, wird als <ticket>.failed aus der Warteschlange genommen und erhält ein
+    Fehlerergebnis, statt jeden weiteren Stapel zu blockieren. Dateien, die älter als
+    max_age Sekunden sind (Ergebnisse und Produkte abgestürzter Prozesse), werden gelöscht.
+    """
+
+    def __init__(self, manager, max_batch=500, max_age=3600):
+        self.manager = manager
+        self.max_batch = max_batch
+        self.max_age = max_age
+
+    def submit(self, product_name, product_description, steps, progress=None):
+        """Gibt (status, datei) wie ProductXMLManager.main zurück; progress wie dort."""
+        report = progress or (lambda phase, value: None)
+        pending_dir = os.path.join(os.getcwd(), PENDING_DIR)
+        os.makedirs(pending_dir, exist_ok=True)
+        ticket = self._spool(pending_dir, product_name, product_description, steps)
+        report("warten", 5)
+        with self.manager.locked():
+            result = self._take_result(pending_dir, ticket)
+            while result is None:
+                self._expire(pending_dir, ticket)
+                if not os.path.exists(os.path.join(pending_dir, ticket + ".json")):
+                    raise ValueError(f"Produkt '{product_name}' wurde aus der Warteschlange entfernt")
+                for other, other_result in self._commit(pending_dir, self._read_pending(pending_dir), report):
+                    if other == ticket:
+                        result = other_result
+                    elif isinstance(other_result, Exception):
+                        self._write_result(pending_dir, other, ("error", str(other_result)))
+                    else:
+                        self._write_result(pending_dir, other, other_result)
+        if isinstance(result, Exception):
+            # Der Aufrufer erhält den Fehler selbst, das eigene Ticket wird nicht mehr gebraucht
+            os.remove(os.path.join(pending_dir, ticket + ".failed"))
+            raise result
+        if result[0] == "error":
+            raise ValueError(f"Produkt '{product_name}' konnte nicht geschrieben werden: {result[1]}")
+        return result
+
+    def _commit(self, pending_dir, batch, report):
+        """Schreibt batch und nimmt die Produkte aus der Warteschlange.
+
+        Gibt [(ticket, Ergebnis)] zurück; Ergebnis ist (status, datei) oder die Exception,
+        mit der das Produkt auch allein gescheitert ist.
+        """
+        try:
+            results = self.manager.commit_batch_locked([product for _, product in batch], report)
+        except Exception as e:
+            if len(batch) > 1:
+                # Das fehlerhafte Produkt ist unbekannt: jedes einzeln versuchen
+                return [item for entry in batch for item in self._commit(pending_dir, [entry], report)]
+            results = [e]
+        done = []
+        for (ticket, _), result in zip(batch, results):
+            path = os.path.join(pending_dir, ticket + ".json")
+            if isinstance(result, Exception):
+                os.replace(path, os.path.join(pending_dir, ticket + ".failed"))
+            else:
+                os.remove(path)
+            done.append((ticket, result))
+        return done
+
+    def _expire(self, pending_dir, keep):
+        # Nur unter der Katalogsperre aufrufen; keep ist das eigene, noch wartende Ticket
+        limit = time.time() - self.max_age
+        for name in os.listdir(pending_dir):
+            if name.startswith(keep):
+                continue
+            path = os.path.join(pending_dir, name)
+            try:
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+            except OSError:
+                # Inzwischen abgeholt (Ergebnisse werden ohne Sperre gelesen)
+                pass
+
+    def _spool(self, pending_dir, product_name, product_description, steps):
+        # Zeitstempel vorne, damit die Produkte in Ankunftsreihenfolge geschrieben werden
+        ticket = f"{time.time_ns():020d}-{os.getpid()}-{threading.get_ident()}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(pending_dir, ticket + ".json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump([product_name, product_description, [list(step) for step in steps]], f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+        return ticket
+
+    def _read_pending(self, pending_dir):
+        tickets = sorted(name[:-5] for name in os.listdir(pending_dir) if name.endswith(".json"))
+        batch = []
+        for ticket in tickets[:self.max_batch]:
+            path = os.path.join(pending_dir, ticket + ".json")
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    product_name, product_description, steps = json.load(f)
+                steps = [tuple(step) for step in steps]
+            except (ValueError, TypeError) as e:
+                # Unlesbares Ticket ebenfalls aus der Warteschlange nehmen
+                os.replace(path, os.path.join(pending_dir, ticket + ".failed"))
+                self._write_result(pending_dir, ticket, ("error", f"Ticket nicht lesbar: {e}"))
+                continue
+            batch.append((ticket, (product_name, product_description, steps)))
+        return batch
+
+    def _write_result(self, pending_dir, ticket, result):
+        path = os.path.join(pending_dir, ticket + ".result")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(list(result), f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def _take_result(self, pending_dir, ticket):
+        path = os.path.join(pending_dir, ticket + ".result")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                status, file_path = json.load(f)
+        except FileNotFoundError:
+            return None
+        os.remove(path)
+        return status, file_path
@@ -0,0 +1,80 @@
+"""Übernahme des aktuellen Katalogs in den Settings-Ordner der MiniMES-Software.
+
+Bisher musste die products-Datei auf dem Anlagen-PC (MPS203-|40, Dokumente,
+MPS_MiniMES, Settings) von Hand gelöscht, die neue Datei hineinkopiert und in
+products.xml umbenannt werden. deploy_file erledigt das in einem Schritt: kopieren
+in eine temporäre Datei im Zielordner, dann atomar ersetzen. Ist der Inhalt dort
+bereits aktuell (gleicher SHA-256), wird gar nichts geschrieben.
+
+Jeder Vorgang wird als JSON-Zeile im Deploy-Log (products-deploy.jsonl) festgehalten.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+
+from product_xml import file_content_hash
+
+DEPLOY_FILE = "products.xml"
+DEPLOY_LOG = "products-deploy.jsonl"
+# Standard-Zielordner, z.B. das Netzlaufwerk des Anlagen-PCs
+DEPLOY_DIR_ENV = "QUICKLOAD_DEPLOY_DIR"
+
+
+def read_deploy_log(log_path):
+    if not os.path.exists(log_path):
+        return []
+    entries = []
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries
+
+
+def deployed_hash(target_path, log_path):
+    """SHA-256 der Datei im Zielordner (None, wenn es sie nicht gibt).
+
+    Stimmen Größe und Änderungszeit mit dem letzten Log-Eintrag überein, wird der Hash
+    aus dem Log übernommen, ohne die Datei auf dem Anlagen-PC erneut zu lesen.
+    """
+    try:
+        stat = os.stat(target_path)
+    except OSError:
+        return None
+    for entry in reversed(read_deploy_log(log_path)):
+        if entry.get("target") == os.path.abspath(target_path):
+            if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+                return entry.get("sha256")
+            break
+    return file_content_hash(target_path)
+
+
+def deploy_file(source_path, target_dir, content_hash, log_path, source_name=None):
+    """Veröffentlicht source_path als products.xml in target_dir und gibt den Log-Eintrag zurück.
+
+    source_name: Herkunft für das Log, wenn source_path nur ein temporärer Export ist.
+    """
+    target_path = os.path.abspath(os.path.join(target_dir, DEPLOY_FILE))
+    entry = {
+        "time": datetime.now().isoformat(timespec="milliseconds"),
+        "source": source_name or os.path.basename(source_path),
+        "target": target_path,
+        "sha256": content_hash,
+    }
+    if deployed_hash(target_path, log_path) == content_hash:
+        entry["status"] = "unchanged"
+    else:
+        os.makedirs(target_dir, exist_ok=True)
+        temp_path = target_path + ".tmp"
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, target_path)
+        entry["status"] = "deployed"
+    stat = os.stat(target_path)
+    entry["size"] = stat.st_size
+    entry["mtime_ns"] = stat.st_mtime_ns
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return entry
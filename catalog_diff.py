@@ -0,0 +1,126 @@
+"""Vergleich und Zusammenführung zweier Katalogdateien auf Produktebene.
+
+Jedes Produkt wird über seinen Namen und den kanonischen Hash des Arbeitsplans
+(workplan_hash, ohne Schrittnummern) erkannt, zusätzlich über einen Hash mit der
+Beschreibung. Beide Dateien werden nur per iterparse gelesen; im Speicher bleiben
+nur die Hashes, daher ist der Aufwand linear in der Dateigröße.
+
+Beim Zusammenführen (z.B. Kataloge zweier Stationen) bleiben alle Produkte aus
+base erhalten und neue Produkte aus other kommen hinzu. Für gleichnamige Produkte
+mit abweichendem Arbeitsplan oder abweichender Beschreibung entscheidet die Regel:
+- "fail":   abbrechen (MergeConflict), nichts wird geschrieben
+- "ours":   Stand aus base behalten
+- "theirs": Stand aus other übernehmen
+- "both":   beide Arbeitspläne behalten (wie add_product es für neue Pläne erlaubt)
+"""
+import hashlib
+import os
+import xml.etree.ElementTree as ET
+
+from product_xml import (HashingWriter, element_steps, iter_product_elements, workplan_hash,
+                         write_pretty_element, write_start_tag)
+
+POLICIES = ("fail", "ours", "theirs", "both")
+
+
+class MergeConflict(Exception):
+    def __init__(self, names):
+        super().__init__(f"{len(names)} Produkte unterscheiden sich in beiden Katalogen: {', '.join(sorted(names))}")
+        self.names = names
+
+
+def product_key(product):
+    """(Name, Arbeitsplan-Hash, Produkt-Hash) eines Product-Elements."""
+    name = product.findtext("ProductName") or ""
+    plan = workplan_hash(element_steps(product) or [])
+    description = product.findtext("ProductDescription") or ""
+    product_hash = hashlib.sha1(f"{name}\x1f{description}\x1f{plan}".encode("utf-8")).hexdigest()
+    return name, plan, product_hash
+
+
+def summarize(file_path):
+    """Liest eine Katalogdatei als {Name: {Arbeitsplan-Hash: Produkt-Hash}}."""
+    products = {}
+    for _, product in iter_product_elements(file_path):
+        name, plan, product_hash = product_key(product)
+        products.setdefault(name, {})[plan] = product_hash
+    return products
+
+
+def diff_summaries(base, other):
+    added = sorted(name for name in other if name not in base)
+    removed = sorted(name for name in base if name not in other)
+    changed = sorted(name for name in base if name in other and base[name] != other[name])
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+def diff_catalogs(base_path, other_path):
+    """Gibt die Namen der hinzugekommenen, entfernten und geänderten Produkte zurück."""
+    return diff_summaries(summarize(base_path), summarize(other_path))
+
+
+def merge_catalogs(base_path, other_path, target_path, policy="fail", manager=None):
+    """Schreibt base und other zusammengeführt nach target_path und gibt (Diff, SHA-256) zurück.
+
+    Mit manager wird das Ergebnis vor dem atomaren Ersetzen gegen das XSD-Schema geprüft.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unbekannte Konfliktregel: {policy}")
+    base = summarize(base_path)
+    other = summarize(other_path)
+    diff = diff_summaries(base, other)
+    conflicts = set(diff["changed"])
+    if conflicts and policy == "fail":
+        raise MergeConflict(conflicts)
+
+    temp_path = target_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        writer = HashingWriter(f)
+        writer.write('<?xml version="1.0" ?>\n')
+        root = None
+        started = False
+        for path in (base_path, other_path):
+            written = set()
+            for root, product in iter_product_elements(path):
+                if not keep_product(product, path is base_path, base, conflicts, policy, written):
+                    continue
+                if not started:
+                    write_start_tag(writer, root)
+                    writer.write(">\n")
+                    started = True
+                write_pretty_element(writer, product, "  ")
+            if root is None:
+                root = ET.parse(path).getroot()
+        if started:
+            writer.write(f"</{root.tag}>\n")
+        else:
+            write_pretty_element(writer, ET.Element(root.tag, root.attrib))
+
+    if manager is not None and not manager.validate_xml(temp_path):
+        os.remove(temp_path)
+        raise ValueError(f"Zusammengeführter Katalog entspricht nicht dem XSD-Schema: {target_path}")
+    os.replace(temp_path, target_path)
+    return diff, writer.hexdigest()
+
+
+def keep_product(product, from_base, base, conflicts, policy, written):
+    """Entscheidet, ob ein Produkt aus base bzw. other in den zusammengeführten Katalog kommt."""
+    name, plan, _ = product_key(product)
+    if from_base:
+        return not (name in conflicts and policy == "theirs")
+    if (name, plan) in written:
+        return False
+    if name not in base:
+        keep = True
+    elif name not in conflicts:
+        # Gleicher Stand wie in base, steht schon im Ergebnis
+        keep = False
+    elif policy == "theirs":
+        keep = True
+    elif policy == "both":
+        keep = plan not in base[name]
+    else:
+        keep = False
+    if keep:
+        written.add((name, plan))
+    return keep
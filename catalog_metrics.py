@@ -0,0 +1,159 @@
+"""Zeitmessung und Zähler für Katalog-Operationen von ProductXMLManager.
+
+Jede Operation (z.B. main, add_products_bulk) besteht aus Phasen wie schema, parse,
+validate, duplicate_check, save_xml und rename_file. CatalogMetrics misst diese
+Phasen, zählt gelesene/geschriebene Bytes und Validierungen und gibt die Werte weiter:
+- an registrierte Hooks (callback(event) mit einem Dict pro Phase bzw. Operation),
+- als eine strukturierte Logzeile (JSON) pro Operation über logging ("quickload.metrics"),
+- optional als Prometheus-Textdatei (z.B. für den node_exporter textfile collector).
+
+Ohne Messung verwendet ProductXMLManager NULL_METRICS, dessen Methoden nichts tun.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger("quickload.metrics")
+
+
+class NullMetrics:
+    """Abgeschaltete Messung: gemeinsamer Kontextmanager, keine Zeitmessung."""
+    enabled = False
+    _null = nullcontext()
+
+    def operation(self, name):
+        return self._null
+
+    def phase(self, name):
+        return self._null
+
+    def count(self, name, value=1):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+class CatalogMetrics:
+    enabled = True
+
+    def __init__(self, hooks=None, log=True, prometheus_file=None):
+        self.hooks = list(hooks or [])
+        self.log = log
+        self.prometheus_file = prometheus_file
+        # Laufende Operation je Thread: Name, Phasenzeiten, Zähler
+        self._local = threading.local()
+        # Summen über alle Operationen und Threads (für Prometheus), geschützt durch _lock
+        self._lock = threading.Lock()
+        self.phase_seconds = {}
+        self.phase_calls = {}
+        self.operations = {}
+        self.counters = {}
+
+    def add_hook(self, callback):
+        self.hooks.append(callback)
+
+    @property
+    def _operation(self):
+        return getattr(self._local, "operation", None)
+
+    @_operation.setter
+    def _operation(self, value):
+        self._local.operation = value
+
+    def _emit(self, event):
+        for hook in self.hooks:
+            hook(event)
+
+    @contextmanager
+    def operation(self, name):
+        if self._operation is not None:
+            # Verschachtelte Operationen zählen zur äußeren
+            yield
+            return
+        self._operation = {"operation": name, "phases": {}, "counters": {}}
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            summary = self._operation
+            self._operation = None
+            summary["seconds"] = time.perf_counter() - start
+            summary["status"] = status
+            with self._lock:
+                self.operations[(name, status)] = self.operations.get((name, status), 0) + 1
+            self._emit(dict(summary, type="operation"))
+            if self.log:
+                line = dict(summary, seconds=round(summary["seconds"], 6),
+                            phases={phase: round(seconds, 6) for phase, seconds in summary["phases"].items()})
+                logger.info(json.dumps(line, ensure_ascii=False, sort_keys=True))
+            if self.prometheus_file:
+                self.write_prometheus(self.prometheus_file)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + seconds
+                self.phase_calls[name] = self.phase_calls.get(name, 0) + 1
+            operation = None
+            if self._operation is not None:
+                operation = self._operation["operation"]
+                phases = self._operation["phases"]
+                phases[name] = phases.get(name, 0.0) + seconds
+            self._emit({"type": "phase", "operation": operation, "phase": name, "seconds": seconds})
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        if self._operation is not None:
+            counters = self._operation["counters"]
+            counters[name] = counters.get(name, 0) + value
+
+    def prometheus_text(self):
+        with self._lock:
+            return self._prometheus_text()
+
+    def _prometheus_text(self):
+        lines = [
+            "# HELP quickload_phase_seconds_total Summierte Laufzeit je Phase.",
+            "# TYPE quickload_phase_seconds_total counter",
+        ]
+        for name, seconds in sorted(self.phase_seconds.items()):
+            lines.append(f'quickload_phase_seconds_total{{phase="{name}"}} {seconds:.6f}')
+        lines += [
+            "# HELP quickload_phase_calls_total Anzahl Aufrufe je Phase.",
+            "# TYPE quickload_phase_calls_total counter",
+        ]
+        for name, calls in sorted(self.phase_calls.items()):
+            lines.append(f'quickload_phase_calls_total{{phase="{name}"}} {calls}')
+        lines += [
+            "# HELP quickload_operations_total Anzahl Operationen je Ergebnis.",
+            "# TYPE quickload_operations_total counter",
+        ]
+        for (name, status), count in sorted(self.operations.items()):
+            lines.append(f'quickload_operations_total{{operation="{name}",status="{status}"}} {count}')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE quickload_{name}_total counter")
+            lines.append(f"quickload_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, file_path):
+        # Atomar ersetzen, damit der Collector nie eine halbe Datei liest
+        temp_path = file_path + ".tmp"
+        with self._lock:
+            text = self._prometheus_text()
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temp_path, file_path)
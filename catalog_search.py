@@ -0,0 +1,112 @@
+"""Suche im Produktkatalog über Indizes statt über das XML.
+
+Beim Laden werden drei Indizes aufgebaut:
+- eine sortierte Liste der Produktnamen (Präfixsuche mit bisect, z.B. "Rote"),
+- Funktionscode (RR, MC, CC, SI, ...) -> Produkte,
+- Wort aus der ProductDescription -> Produkte.
+
+Beispiel: index.search(functions=["CC", "SI"]) findet alle Produkte mit
+Farbkontrolle und internationalem Vertrieb.
+"""
+import bisect
+import re
+
+from product_xml import element_steps, iter_products
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return set(_TOKEN.findall((text or "").lower()))
+
+
+class CatalogSearchIndex:
+    def __init__(self):
+        # Produktnummer (Reihenfolge im Katalog) -> (Name, Beschreibung, Funktionscodes)
+        self.products = []
+        # Sortierte (kleingeschriebener Name, Produktnummer)-Paare für die Präfixsuche
+        self.names = []
+        self.by_function = {}
+        self.by_token = {}
+
+    @classmethod
+    def from_products(cls, products):
+        """Baut den Index aus (Name, Beschreibung, Schritte) auf; Schritte wie in iter_products."""
+        index = cls()
+        for product_name, product_description, steps in products:
+            index._append(product_name, product_description, steps)
+        index.names.sort()
+        return index
+
+    @classmethod
+    def from_file(cls, file_path):
+        return cls.from_products(iter_products(file_path))
+
+    @classmethod
+    def from_tree(cls, tree):
+        return cls.from_products(
+            (product.findtext("ProductName"), product.findtext("ProductDescription"), element_steps(product))
+            for product in tree.getroot().findall("Product"))
+
+    def _append(self, product_name, product_description, steps):
+        product_id = len(self.products)
+        # Schritte als (Function, ...)-Tupel; nur der Funktionscode wird indiziert
+        codes = tuple(step[0] for step in steps or [])
+        self.products.append((product_name or "", product_description or "", codes))
+        self.names.append(((product_name or "").lower(), product_id))
+        for code in set(codes):
+            self.by_function.setdefault(code.upper(), set()).add(product_id)
+        for token in tokenize(product_description):
+            self.by_token.setdefault(token, set()).add(product_id)
+        return product_id
+
+    def add(self, product_name, product_description, steps):
+        """Ergänzt die Indizes um ein neu hinzugefügtes Produkt."""
+        product_id = self._append(product_name, product_description, steps)
+        # _append hat den Namen hinten angehängt, an die richtige Stelle verschieben
+        entry = self.names.pop()
+        bisect.insort(self.names, entry)
+        return product_id
+
+    def __len__(self):
+        return len(self.products)
+
+    def with_name_prefix(self, prefix):
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.names, (prefix,))
+        ids = set()
+        for name, product_id in self.names[start:]:
+            if not name.startswith(prefix):
+                break
+            ids.add(product_id)
+        return ids
+
+    def with_functions(self, codes):
+        """Produkte, deren Arbeitsplan alle Funktionscodes enthält."""
+        sets = [self.by_function.get(code.upper(), set()) for code in codes]
+        return set.intersection(*sets) if sets else set(range(len(self.products)))
+
+    def with_description(self, text):
+        """Produkte, deren Beschreibung alle Wörter aus text enthält."""
+        sets = [self.by_token.get(token, set()) for token in tokenize(text)]
+        return set.intersection(*sets) if sets else set(range(len(self.products)))
+
+    def search(self, name_prefix=None, functions=(), text=None, limit=None):
+        """Kombiniert die Bedingungen (UND) und gibt (Name, Beschreibung, Codes) in Katalogreihenfolge zurück."""
+        candidates = []
+        if functions:
+            candidates.append(self.with_functions(functions))
+        if text:
+            candidates.append(self.with_description(text))
+        if name_prefix:
+            candidates.append(self.with_name_prefix(name_prefix))
+        if candidates:
+            # Mit der kleinsten Menge beginnen
+            candidates.sort(key=len)
+            ids = candidates[0].intersection(*candidates[1:])
+        else:
+            ids = range(len(self.products))
+        ids = sorted(ids)
+        if limit is not None:
+            ids = ids[:limit]
+        return [self.products[product_id] for product_id in ids]
@@ -0,0 +1,216 @@
+"""Produktkatalog in einer SQLite-Datenbank statt in den products-<Zeitstempel>.xml Dateien.
+
+Produkte, Arbeitspläne und Schritte liegen in indizierten Tabellen. Hinzufügen,
+Nachschlagen und die Duplikatprüfung sind einzelne Transaktionen bzw. Abfragen und
+hängen nicht mehr von der Größe des Katalogs ab. Die products.xml für den
+Settings-Ordner der MiniMES-Software wird nur bei Bedarf mit export_xml erzeugt.
+
+Gleiche Schrittfolgen werden wie im ProductCatalog nur einmal gespeichert.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+from product_xml import HashingWriter, iter_product_elements, workplan_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog_attributes (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workplans (
+    id INTEGER PRIMARY KEY,
+    -- Hash der kompletten Schrittfolge inkl. Nummern (für das Zusammenlegen gleicher Pläne)
+    steps_digest TEXT NOT NULL UNIQUE,
+    -- Hash ohne Nummern, wie bei der Duplikatprüfung in ProductXMLManager
+    match_digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    workplan_id INTEGER NOT NULL REFERENCES workplans(id),
+    position INTEGER NOT NULL,
+    number TEXT NOT NULL,
+    function TEXT NOT NULL,
+    parameter TEXT NOT NULL,
+    description TEXT NOT NULL,
+    PRIMARY KEY (workplan_id, position)
+);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    workplan_id INTEGER NOT NULL REFERENCES workplans(id)
+);
+CREATE INDEX IF NOT EXISTS products_name ON products(name);
+CREATE INDEX IF NOT EXISTS workplans_match ON workplans(match_digest);
+CREATE INDEX IF NOT EXISTS steps_function ON steps(function);
+"""
+
+DEFAULT_ATTRIBUTES = {"Version": "1.0", "Creator": "Festo Didactic"}
+
+
+def number_steps(steps):
+    """Nummeriert (Function, Parameter, FunctionDescription)-Schritte wie build_product_element (10, 20, ...)."""
+    return [(str((position + 1) * 10), function, str(parameter), description)
+            for position, (function, parameter, description) in enumerate(steps)]
+
+
+def steps_digest(numbered_steps):
+    return hashlib.sha1(json.dumps(numbered_steps, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class CatalogStore:
+    def __init__(self, db_path="products.sqlite3"):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+        if not self.attributes():
+            self.set_attributes(DEFAULT_ATTRIBUTES)
+
+    def close(self):
+        self.connection.close()
+
+    def attributes(self):
+        """Attribute des Products-Elements (Version, Creator) in der ursprünglichen Reihenfolge."""
+        rows = self.connection.execute("SELECT name, value FROM catalog_attributes ORDER BY position")
+        return dict(rows.fetchall())
+
+    @contextmanager
+    def write_transaction(self):
+        """Transaktion, die die Datenbank sofort für andere Schreiber sperrt (BEGIN IMMEDIATE).
+
+        Ohne das liefe die Duplikatprüfung außerhalb der Transaktion und zwei Prozesse
+        könnten dasselbe Produkt einfügen.
+        """
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            yield
+
+    def set_attributes(self, attrib):
+        with self.connection:
+            self._write_attributes(attrib)
+
+    def _write_attributes(self, attrib):
+        self.connection.execute("DELETE FROM catalog_attributes")
+        self.connection.executemany("INSERT INTO catalog_attributes (name, value) VALUES (?, ?)",
+                                    attrib.items())
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def product_exists(self, product_name, steps):
+        row = self.connection.execute(
+            "SELECT 1 FROM products JOIN workplans ON workplans.id = products.workplan_id"
+            " WHERE products.name = ? AND workplans.match_digest = ? LIMIT 1",
+            (product_name, workplan_hash(steps))).fetchone()
+        return row is not None
+
+    def _workplan_id(self, numbered_steps, cache=None):
+        # Muss innerhalb einer Transaktion aufgerufen werden
+        digest = steps_digest(numbered_steps)
+        if cache is not None and digest in cache:
+            return cache[digest]
+        row = self.connection.execute("SELECT id FROM workplans WHERE steps_digest = ?", (digest,)).fetchone()
+        if row is not None:
+            workplan_id = row[0]
+        else:
+            match = workplan_hash([(function, parameter, description)
+                                   for _, function, parameter, description in numbered_steps])
+            workplan_id = self.connection.execute(
+                "INSERT INTO workplans (steps_digest, match_digest) VALUES (?, ?)", (digest, match)).lastrowid
+            self.connection.executemany(
+                "INSERT INTO steps (workplan_id, position, number, function, parameter, description)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(workplan_id, position) + tuple(step) for position, step in enumerate(numbered_steps)])
+        if cache is not None:
+            cache[digest] = workplan_id
+        return workplan_id
+
+    def _insert(self, product_name, product_description, numbered_steps, cache=None):
+        workplan_id = self._workplan_id(numbered_steps, cache)
+        self.connection.execute("INSERT INTO products (name, description, workplan_id) VALUES (?, ?, ?)",
+                                (product_name, product_description or "", workplan_id))
+
+    def add_product(self, product_name, product_description, steps):
+        """Fügt ein Produkt in einer Transaktion hinzu. Gibt False zurück, wenn es schon existiert."""
+        with self.write_transaction():
+            if self.product_exists(product_name, steps):
+                return False
+            self._insert(product_name, product_description, number_steps(steps))
+        return True
+
+    def add_products(self, products):
+        """Fügt (Name, Beschreibung, Schritte)-Tupel in einer Transaktion hinzu und gibt die Anzahl neuer Produkte zurück.
+
+        Bereits vorhandene Produkte (auch doppelte innerhalb von products) werden übersprungen.
+        """
+        added = 0
+        cache = {}
+        with self.write_transaction():
+            for product_name, product_description, steps in products:
+                if self.product_exists(product_name, steps):
+                    continue
+                self._insert(product_name, product_description, number_steps(steps), cache)
+                added += 1
+        return added
+
+    def import_xml(self, file_path):
+        """Übernimmt eine vorhandene Katalogdatei in einer einzigen Transaktion.
+
+        Schrittnummern und Parameter werden unverändert übernommen. Bereits vorhandene
+        Produkte werden übersprungen, ein zweiter Import derselben Datei ändert also
+        nichts. Gibt die Anzahl der neu hinzugefügten Produkte zurück.
+        """
+        imported = 0
+        cache = {}
+        attrib = None
+        with self.write_transaction():
+            for root, product in iter_product_elements(file_path):
+                if attrib is None:
+                    attrib = dict(root.attrib)
+                numbered = [
+                    (step.findtext("Number") or "", step.findtext("Function") or "",
+                     step.findtext("Parameter") or "", step.findtext("FunctionDescription") or "")
+                    for step in product.iterfind("Workplan/Step")
+                ]
+                product_name = product.findtext("ProductName") or ""
+                if self.product_exists(product_name, [step[1:] for step in numbered]):
+                    continue
+                self._insert(product_name, product.findtext("ProductDescription") or "", numbered, cache)
+                imported += 1
+            if attrib:
+                self._write_attributes(attrib)
+        return imported
+
+    def iter_products(self):
+        """Liefert alle Produkte als (Name, Beschreibung, nummerierte Schritte) in Einfügereihenfolge."""
+        workplans = {}
+        for product_name, product_description, workplan_id in self.connection.execute(
+                "SELECT name, description, workplan_id FROM products ORDER BY id"):
+            steps = workplans.get(workplan_id)
+            if steps is None:
+                steps = workplans[workplan_id] = self.connection.execute(
+                    "SELECT number, function, parameter, description FROM steps"
+                    " WHERE workplan_id = ? ORDER BY position", (workplan_id,)).fetchall()
+            yield product_name, product_description, steps
+
+    def export_xml(self, target_path, validate=None):
+        """Schreibt den Katalog als products.xml und gibt den SHA-256 des Inhalts zurück.
+
+        Die Datei wird erst in eine temporäre Datei geschrieben, mit validate(pfad) geprüft
+        und dann atomar ersetzt; die MiniMES-Software sieht nie einen halben Stand.
+        """
+        from product_catalog import write_products_xml
+        temp_path = target_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            writer = HashingWriter(f)
+            write_products_xml(writer, self.attributes(), self.iter_products())
+        if validate is not None and not validate(temp_path):
+            os.remove(temp_path)
+            raise ValueError(f"Export entspricht nicht dem XSD-Schema: {target_path}")
+        os.replace(temp_path, target_path)
+        return writer.hexdigest()
@@ -0,0 +1,120 @@
+"""Regressionsprüfung: alle Schreibwege erzeugen byteweise dieselbe Datei wie früher minidom.
+
+Bis user-003 wurde der Katalog über ET.tostring -> minidom -> toprettyxml geschrieben.
+Die MiniMES-Software und die Hash-Vergleiche (Deploy, Überspringen unveränderter
+Dateien) verlassen sich darauf, dass write_pretty_xml, ProductCatalog.write_xml,
+export_streaming und der Export aus dem CatalogStore genau dieses Format liefern.
+
+Beispiel:
+    python check_pretty_xml.py
+    python check_pretty_xml.py products-2025-07-02_22-03-08-851.xml
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from xml.dom import minidom
+
+from product_xml import FUNCTION_DESCRIPTIONS, build_product_element, export_streaming, write_pretty_xml
+
+# Texte, an denen sich Maskierung und Zeilenenden unterscheiden würden
+TRICKY_TEXTS = [
+    "Rot & Schwarz",
+    "a < b > c",
+    'Kappe "rund" und \'eckig\'',
+    "Zeile 1\r\nZeile 2\rZeile 3\n",
+    "  führende und folgende Leerzeichen  ",
+    "Umlaute äöüß und €",
+]
+
+
+def minidom_reference(root):
+    """Die frühere save_xml-Ausgabe (ET.tostring -> minidom -> toprettyxml)."""
+    parsed = minidom.parseString(ET.tostring(root, encoding="utf-8"))
+    for element in parsed.getElementsByTagName("*"):
+        for child in list(element.childNodes):
+            if child.nodeType == child.TEXT_NODE and not child.data.strip():
+                element.removeChild(child)
+    return parsed.toprettyxml(indent="  ", newl="\n")
+
+
+def tricky_catalog():
+    root = ET.Element("Products", Version="1.0", Creator='Festo "Didactic" & Co')
+    for number, text in enumerate(TRICKY_TEXTS):
+        root.append(build_product_element(f"Produkt {number}: {text}", text,
+                                          [("RR", 1, FUNCTION_DESCRIPTIONS["RR"]), ("CC", number, text)]))
+    return root
+
+
+def mixed_content():
+    # Kein Katalog, aber write_pretty_xml muss auch Text mit Tail und leere Elemente wie minidom behandeln
+    root = ET.fromstring('<Products a="x&amp;y"><P>Text<B>fett</B>Tail &lt;1&gt;<E/></P><Leer></Leer>'
+                         '<W>  \n  </W></Products>')
+    return root
+
+
+def write_to_string(write):
+    buffer = io.StringIO()
+    write(buffer)
+    return buffer.getvalue()
+
+
+def read_text(file_path):
+    with open(file_path, "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def catalog_outputs(file_path, work_dir):
+    """Liefert (Name, Ausgabe) aller Schreibwege für eine Katalogdatei."""
+    from catalog_store import CatalogStore
+    from product_catalog import ProductCatalog
+    tree = ET.parse(file_path)
+    yield "write_pretty_xml", write_to_string(lambda f: write_pretty_xml(f, tree.getroot()))
+    yield "ProductCatalog.write_xml", write_to_string(ProductCatalog.from_file(file_path).write_xml)
+
+    target = os.path.join(work_dir, "export.xml")
+    export_streaming(file_path, target)
+    yield "export_streaming", read_text(target)
+
+    store = CatalogStore(os.path.join(work_dir, "store.sqlite3"))
+    store.import_xml(file_path)
+    store.export_xml(target)
+    store.close()
+    yield "CatalogStore.export_xml", read_text(target)
+
+
+def check(label, expected, actual):
+    if actual == expected:
+        print(f"OK\t{label}")
+        return True
+    # Erste abweichende Stelle zeigen
+    position = next((i for i, (a, b) in enumerate(zip(expected, actual)) if a != b), min(len(expected), len(actual)))
+    print(f"ABWEICHUNG\t{label}\tbei Zeichen {position}: "
+          f"erwartet {expected[position:position + 40]!r}, erhalten {actual[position:position + 40]!r}")
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Schreibwege gegen die frühere minidom-Ausgabe prüfen")
+    parser.add_argument("files", nargs="*", help="Zusätzliche Katalogdateien (z.B. die products-*.xml)")
+    args = parser.parse_args(argv)
+
+    ok = True
+    root = mixed_content()
+    ok &= check("write_pretty_xml (gemischter Inhalt)", minidom_reference(root),
+                write_to_string(lambda f: write_pretty_xml(f, root)))
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        tricky_path = os.path.join(work_dir, "products-tricky.xml")
+        ET.ElementTree(tricky_catalog()).write(tricky_path, encoding="utf-8", xml_declaration=True)
+        for file_path in [tricky_path] + args.files:
+            expected = minidom_reference(ET.parse(file_path).getroot())
+            for label, output in catalog_outputs(file_path, tempfile.mkdtemp(dir=work_dir)):
+                ok &= check(f"{label} ({os.path.basename(file_path)})", expected, output)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Ereignisdiskrete Simulation der Industrie 4.0 Anlage für die Arbeitspläne eines Katalogs.
+
+Jeder Auftrag belegt einen Werkstückträger und durchläuft die Schritte seines
+Workplans (aus dem ProductCatalog) an den Stationen der Anlage:
+    RR/RB/RS -> Magazin, MC -> Fügen, CC -> Prüfen, SN/SI -> Sortieren
+Bearbeitungs-, Transport- und Umrüstzeiten kommen aus einem Zeitprofil (JSON, sonst
+DEFAULT_PROFILE). Ergebnis sind Durchlaufzeit je Produkt, Auslastung je Station und
+die Engpässe, damit Arbeitsplan-Varianten vor dem Einspielen in die MiniMES-Software
+verglichen werden können.
+
+Beispiel für ein Zeitprofil:
+    {"carriers": 6, "transport_seconds": 4,
+     "stations": {"Magazin": {"codes": ["RR", "RB", "RS"], "seconds": 6, "changeover_seconds": 5}, ...}}
+"""
+import csv
+import heapq
+import json
+from collections import deque
+
+from product_catalog import ProductCatalog
+from product_xml import sniff_csv_dialect
+
+# Angenommene Zeiten in Sekunden; für echte Aussagen ein gemessenes Profil übergeben
+DEFAULT_PROFILE = {
+    "carriers": 6,
+    "transport_seconds": 4.0,
+    "stations": {
+        "Magazin": {"codes": ["RR", "RB", "RS"], "seconds": 6.0, "changeover_seconds": 5.0},
+        "Fügen": {"codes": ["MC"], "seconds": 10.0, "changeover_seconds": 0.0},
+        "Prüfen": {"codes": ["CC"], "seconds": 5.0, "changeover_seconds": 0.0},
+        "Sortieren": {"codes": ["SN", "SI"], "seconds": 4.0, "changeover_seconds": 2.0},
+    },
+}
+
+
+def load_profile(file_path=None):
+    if file_path is None:
+        return DEFAULT_PROFILE
+    with open(file_path, "r", encoding="utf-8") as f:
+        profile = json.load(f)
+    return dict(DEFAULT_PROFILE, **profile)
+
+
+def read_orders(file_path):
+    """Liest Aufträge als Liste von Produktnamen in der eingegebenen Reihenfolge.
+
+    CSV: Spalten name und optional quantity (Trennzeichen , ; oder Tab).
+    JSON: Liste von Objekten mit name und optional quantity.
+    Fehlerhafte Zeilen lösen ValueError mit der Zeilennummer aus.
+    """
+    if file_path.lower().endswith(".json"):
+        with open(file_path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        if not isinstance(rows, list):
+            raise ValueError(f"{file_path}: erwartet wird eine Liste von Aufträgen")
+    else:
+        with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+            sample = f.read(4096)
+            f.seek(0)
+            rows = list(csv.DictReader(f, dialect=sniff_csv_dialect(sample)))
+    orders = []
+    for number, row in enumerate(rows, 1):
+        name = row.get("name") if isinstance(row, dict) else None
+        if not name:
+            raise ValueError(f"{file_path}: Auftrag {number} hat keinen Produktnamen (Spalte name)")
+        try:
+            quantity = int(row.get("quantity") or 1)
+        except (TypeError, ValueError):
+            raise ValueError(f"{file_path}: Auftrag {number} hat eine ungültige Menge: {row.get('quantity')!r}")
+        if quantity < 0:
+            raise ValueError(f"{file_path}: Auftrag {number} hat eine negative Menge: {quantity}")
+        orders.extend([name] * quantity)
+    return orders
+
+
+def catalog_workplans(catalog):
+    """Produktname -> Funktionscodes des Workplans (bei gleichen Namen gilt der letzte Eintrag)."""
+    return {product.name: product.workplan.codes for product in catalog}
+
+
+class Station:
+    __slots__ = ("name", "seconds", "changeover_seconds", "free", "queue", "busy", "last_code", "changeovers")
+
+    def __init__(self, name, config):
+        self.name = name
+        self.seconds = config.get("seconds", 0.0)
+        self.changeover_seconds = config.get("changeover_seconds", 0.0)
+        self.free = config.get("capacity", 1)
+        self.queue = deque()
+        self.busy = 0.0
+        self.last_code = None
+        self.changeovers = 0
+
+    def duration(self, code):
+        seconds = self.seconds[code] if isinstance(self.seconds, dict) else self.seconds
+        if self.last_code is not None and code != self.last_code:
+            seconds += self.changeover_seconds
+            self.changeovers += 1
+        self.last_code = code
+        return seconds
+
+
+def simulate(orders, workplans, profile=DEFAULT_PROFILE):
+    """Simuliert die Aufträge (Produktnamen in Startreihenfolge) und gibt einen Bericht als Dict zurück."""
+    stations = {name: Station(name, config) for name, config in profile["stations"].items()}
+    station_for = {code: name for name, config in profile["stations"].items() for code in config["codes"]}
+    transport = profile.get("transport_seconds", 0.0)
+
+    plans = []
+    for name in orders:
+        codes = workplans.get(name)
+        if codes is None:
+            raise ValueError(f"Produkt '{name}' ist nicht im Katalog")
+        for code in codes:
+            if code not in station_for:
+                raise ValueError(f"Keine Station für Funktion '{code}' (Produkt '{name}')")
+        plans.append(codes)
+
+    # Ereignisse: (Zeit, laufende Nummer, Art, Auftrag); Arten: ankommen, fertig
+    events = []
+    sequence = 0
+    step_of = [0] * len(orders)
+    started = [0.0] * len(orders)
+    arrived = [0.0] * len(orders)
+    # Auftrag -> {Station: Warte- plus Bearbeitungszeit}
+    station_time = [dict() for _ in orders]
+    finished = [0.0] * len(orders)
+    next_order = 0
+    carriers = profile.get("carriers", 1)
+
+    def push(time, kind, order):
+        nonlocal sequence
+        heapq.heappush(events, (time, sequence, kind, order))
+        sequence += 1
+
+    def release(time):
+        # Freie Werkstückträger mit den nächsten Aufträgen belegen
+        nonlocal next_order, carriers
+        while carriers and next_order < len(orders):
+            carriers -= 1
+            started[next_order] = time
+            push(time, "arrive", next_order)
+            next_order += 1
+
+    def start(station, order, time):
+        station.free -= 1
+        code = plans[order][step_of[order]]
+        seconds = station.duration(code)
+        station.busy += seconds
+        push(time + seconds, "done", order)
+
+    release(0.0)
+    now = 0.0
+    while events:
+        now, _, kind, order = heapq.heappop(events)
+        if kind == "arrive":
+            if step_of[order] >= len(plans[order]):
+                finished[order] = now
+                carriers += 1
+                release(now)
+                continue
+            arrived[order] = now
+            station = stations[station_for[plans[order][step_of[order]]]]
+            if station.free:
+                start(station, order, now)
+            else:
+                station.queue.append(order)
+        else:
+            station = stations[station_for[plans[order][step_of[order]]]]
+            station_time[order][station.name] = station_time[order].get(station.name, 0.0) + now - arrived[order]
+            station.free += 1
+            step_of[order] += 1
+            push(now + transport, "arrive", order)
+            if station.queue:
+                start(station, station.queue.popleft(), now)
+
+    return build_report(orders, started, finished, station_time, stations, now)
+
+
+def build_report(orders, started, finished, station_time, stations, makespan):
+    products = {}
+    for order, name in enumerate(orders):
+        entry = products.setdefault(name, {"orders": 0, "cycle_seconds": 0.0, "stations": {}})
+        entry["orders"] += 1
+        entry["cycle_seconds"] += finished[order] - started[order]
+        for station, seconds in station_time[order].items():
+            entry["stations"][station] = entry["stations"].get(station, 0.0) + seconds
+    for entry in products.values():
+        count = entry["orders"]
+        entry["cycle_seconds"] /= count
+        entry["stations"] = {station: seconds / count for station, seconds in entry["stations"].items()}
+        # Engpass des Produkts: Station mit der längsten Warte- plus Bearbeitungszeit
+        entry["bottleneck"] = max(entry["stations"], key=entry["stations"].get) if entry["stations"] else None
+
+    utilisation = {name: (station.busy / makespan if makespan else 0.0) for name, station in stations.items()}
+    return {
+        "orders": len(orders),
+        "makespan_seconds": makespan,
+        "throughput_per_hour": len(orders) / makespan * 3600 if makespan else 0.0,
+        "utilisation": utilisation,
+        "changeovers": {name: station.changeovers for name, station in stations.items()},
+        "bottleneck": max(utilisation, key=utilisation.get) if utilisation else None,
+        "products": products,
+    }
+
+
+def simulate_catalog(catalog_path, orders, profile=DEFAULT_PROFILE):
+    return simulate(orders, catalog_workplans(ProductCatalog.from_file(catalog_path)), profile)
+
+
+def format_report(report):
+    lines = [
+        f"{report['orders']} Aufträge in {report['makespan_seconds'] / 60:.1f} min "
+        f"({report['throughput_per_hour']:.1f} pro Stunde), Engpass: {report['bottleneck']}",
+        "",
+        "Station        Auslastung  Umrüstungen",
+    ]
+    for name, value in report["utilisation"].items():
+        lines.append(f"{name:<14} {value * 100:9.1f} %  {report['changeovers'][name]:11d}")
+    lines += ["", "Produkt                        Aufträge  Durchlaufzeit  Engpass"]
+    for name, entry in sorted(report["products"].items()):
+        lines.append(f"{name[:30]:<30} {entry['orders']:8d}  {entry['cycle_seconds']:11.1f} s  {entry['bottleneck']}")
+    return "\n".join(lines)
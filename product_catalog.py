@@ -0,0 +1,207 @@
+"""Katalogmodell im Speicher mit inhaltsadressierten Arbeitsplänen.
+
+Viele Produkte unterscheiden sich nur in Name und Beschreibung, haben aber denselben
+Workplan (z.B. RR, MC, SI). Der ProductCatalog speichert jede Schrittfolge nur einmal
+und die Produkte verweisen darauf. Erst beim Schreiben wird wieder das XML-Format der
+MES-Software (Products/Product/Workplan/Step) erzeugt.
+
+Statt einzelner Element-Objekte und Zeichenketten pro Schritt speichert ein Workplan
+nur Indizes in die gemeinsamen Tabellen STEP_KINDS (Function + FunctionDescription)
+und STEP_VALUES (Number- bzw. Parameter-Texte), drei Zahlen pro Schritt in einem array.
+"""
+import xml.etree.ElementTree as ET
+from array import array
+
+from product_xml import (catalog_seed, chain_hash, iter_product_elements, product_hash, workplan_hash,
+                         write_start_tag, write_text_element)
+
+
+class InternTable:
+    """Vergibt für jeden Wert eine feste Nummer; gleiche Werte werden nur einmal gespeichert."""
+    __slots__ = ("values", "numbers")
+
+    def __init__(self):
+        self.values = []
+        self.numbers = {}
+
+    def number(self, value):
+        number = self.numbers.get(value)
+        if number is None:
+            number = self.numbers[value] = len(self.values)
+            self.values.append(value)
+        return number
+
+
+# Prozessweit gemeinsam: (Function, FunctionDescription)-Paare und Number/Parameter-Texte
+STEP_KINDS = InternTable()
+STEP_VALUES = InternTable()
+
+
+def encode_steps(steps):
+    """Wandelt (Number, Function, Parameter, FunctionDescription)-Tupel in ein array um."""
+    data = array("I")
+    for number, function, parameter, description in steps:
+        data.extend((STEP_VALUES.number(number), STEP_KINDS.number((function, description)),
+                     STEP_VALUES.number(parameter)))
+    return data
+
+
+class Workplan:
+    """Schrittfolge, je Schritt (Number, Function/FunctionDescription, Parameter) als Tabellenindex, wird nicht verändert."""
+    __slots__ = ("data", "digest")
+
+    def __init__(self, data):
+        self.data = data
+        # Hash ohne Schrittnummern, wie beim Duplikatvergleich in ProductXMLManager
+        self.digest = workplan_hash([(function, parameter, description)
+                                     for _, function, parameter, description in self.steps])
+
+    @property
+    def steps(self):
+        """Die Schritte als (Number, Function, Parameter, FunctionDescription)-Tupel."""
+        values = STEP_VALUES.values
+        kinds = STEP_KINDS.values
+        data = self.data
+        steps = []
+        for position in range(0, len(data), 3):
+            function, description = kinds[data[position + 1]]
+            steps.append((values[data[position]], function, values[data[position + 2]], description))
+        return steps
+
+    @property
+    def codes(self):
+        kinds = STEP_KINDS.values
+        return [kinds[kind][0] for kind in self.data[1::3]]
+
+    def __len__(self):
+        return len(self.data) // 3
+
+
+class Product:
+    __slots__ = ("name", "description", "workplan")
+
+    def __init__(self, name, description, workplan):
+        self.name = name
+        self.description = description
+        self.workplan = workplan
+
+
+class ProductCatalog:
+    def __init__(self, attrib=None):
+        self.attrib = dict(attrib) if attrib else {"Version": "1.0", "Creator": "Festo Didactic"}
+        self.products = []
+        # Kodierte Schrittfolge (bytes) -> Workplan; gleiche Folgen werden nur einmal gespeichert
+        self.workplans = {}
+        # Produktname -> Workplan-Hash bzw. Tupel von Hashes, wenn es den Namen mit
+        # mehreren Arbeitsplänen gibt (Duplikatprüfung in O(1), ohne ein set pro Name)
+        self.index = {}
+        # Kanonischer Hash des Katalogs, wird bei jedem append fortgeschrieben
+        self.canonical = catalog_seed(self.attrib)
+
+    @classmethod
+    def from_file(cls, file_path):
+        """Liest eine Katalogdatei produktweise ein, ohne den ElementTree komplett aufzubauen."""
+        catalog = None
+        for root, product in iter_product_elements(file_path):
+            if catalog is None:
+                catalog = cls(root.attrib)
+            catalog.add_element(product)
+        if catalog is None:
+            catalog = cls(ET.parse(file_path).getroot().attrib)
+        return catalog
+
+    @classmethod
+    def from_element(cls, root):
+        catalog = cls(root.attrib)
+        for product in root.findall("Product"):
+            catalog.add_element(product)
+        return catalog
+
+    def intern_workplan(self, steps):
+        data = encode_steps(steps)
+        key = data.tobytes()
+        workplan = self.workplans.get(key)
+        if workplan is None:
+            workplan = self.workplans[key] = Workplan(data)
+        return workplan
+
+    def add_element(self, product):
+        steps = [
+            (step.findtext("Number") or "", step.findtext("Function") or "",
+             step.findtext("Parameter") or "", step.findtext("FunctionDescription") or "")
+            for step in product.iterfind("Workplan/Step")
+        ]
+        self.append(product.findtext("ProductName") or "", product.findtext("ProductDescription") or "",
+                    self.intern_workplan(steps))
+
+    def append(self, name, description, workplan):
+        self.products.append(Product(name, description, workplan))
+        self.canonical = chain_hash(self.canonical, product_hash(name, description, workplan.digest))
+        known = self.index.get(name)
+        if known is None:
+            self.index[name] = workplan.digest
+        elif isinstance(known, str):
+            if known != workplan.digest:
+                self.index[name] = (known, workplan.digest)
+        elif workplan.digest not in known:
+            self.index[name] = known + (workplan.digest,)
+
+    def product_exists(self, product_name, steps):
+        known = self.index.get(product_name)
+        if known is None:
+            return False
+        digest = workplan_hash(steps)
+        return known == digest if isinstance(known, str) else digest in known
+
+    def add_product(self, product_name, product_description, steps):
+        """Fügt ein Produkt mit (Function, Parameter, FunctionDescription)-Schritten hinzu (Nummern 10, 20, ...)."""
+        numbered = [(str((position + 1) * 10), function, str(parameter), description)
+                    for position, (function, parameter, description) in enumerate(steps)]
+        self.append(product_name, product_description, self.intern_workplan(numbered))
+        return self.products[-1]
+
+    def __len__(self):
+        return len(self.products)
+
+    def __iter__(self):
+        return iter(self.products)
+
+    def write_xml(self, writer, newl="\n"):
+        """Schreibt den Katalog im selben Format wie ProductXMLManager.save_xml."""
+        write_products_xml(writer, self.attrib,
+                           ((product.name, product.description, product.workplan.steps) for product in self.products),
+                           newl)
+
+
+def write_products_xml(writer, attrib, products, newl="\n"):
+    """Schreibt (Name, Beschreibung, nummerierte Schritte) nacheinander als MES-kompatibles XML.
+
+    products darf ein Generator sein; es wird immer nur ein Produkt gleichzeitig benötigt.
+    """
+    writer.write(f'<?xml version="1.0" ?>{newl}')
+    write_start_tag(writer, ET.Element("Products", attrib))
+    started = False
+    for name, description, steps in products:
+        if not started:
+            writer.write(f">{newl}")
+            started = True
+        writer.write(f"  <Product>{newl}")
+        write_text_element(writer, "ProductName", name, "    ", newl)
+        write_text_element(writer, "ProductDescription", description, "    ", newl)
+        if steps:
+            writer.write(f"    <Workplan>{newl}")
+            for number, function, parameter, description in steps:
+                writer.write(f"      <Step>{newl}")
+                write_text_element(writer, "Number", number, "        ", newl)
+                write_text_element(writer, "Function", function, "        ", newl)
+                write_text_element(writer, "Parameter", parameter, "        ", newl)
+                write_text_element(writer, "FunctionDescription", description, "        ", newl)
+                writer.write(f"      </Step>{newl}")
+            writer.write(f"    </Workplan>{newl}")
+        else:
+            writer.write(f"    <Workplan/>{newl}")
+        writer.write(f"  </Product>{newl}")
+    if started:
+        writer.write(f"</Products>{newl}")
+    else:
+        writer.write(f"/>{newl}")
@@ -0,0 +1,179 @@
+"""Änderungsjournal für den Produktkatalog.
+
+Statt bei jedem Speichern den ganzen Katalog neu zu schreiben und einen vollständigen
+Snapshot anzulegen, wird jedes Hinzufügen als kleiner JSON-Datensatz an journal.jsonl
+angehängt. Alle checkpoint_interval Änderungen (oder auf Anforderung) entsteht ein
+vollständiger XML-Checkpoint. Jeder frühere Stand lässt sich aus dem nächstgelegenen
+Checkpoint und dem Journal wiederherstellen.
+"""
+import os
+import re
+import json
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+from catalog_commit import file_lock
+from product_xml import ProductXMLManager, check_product_text
+
+JOURNAL_FILE = "journal.jsonl"
+JOURNAL_LOCK = "journal.lock"
+CHECKPOINT_PATTERN = re.compile(r"^checkpoint-(\d{8})\.xml$")
+
+
+class ProductJournal:
+    def __init__(self, journal_dir="products-journal", checkpoint_interval=100, manager=None):
+        self.journal_dir = journal_dir
+        self.log_path = os.path.join(journal_dir, JOURNAL_FILE)
+        self.lock_path = os.path.join(journal_dir, JOURNAL_LOCK)
+        self.checkpoint_interval = checkpoint_interval
+        self.manager = manager or ProductXMLManager()
+        os.makedirs(journal_dir, exist_ok=True)
+
+        # Aktueller Stand im Speicher, wird beim ersten Zugriff aufgebaut
+        self._tree = None
+        checkpoints = self.checkpoints()
+        self.last_checkpoint = checkpoints[-1] if checkpoints else None
+        self.sequence = self.last_sequence()
+        if self.last_checkpoint is None:
+            with file_lock(self.lock_path):
+                # Eine andere Station könnte den ersten Checkpoint inzwischen geschrieben haben
+                if not self.checkpoints():
+                    self.bootstrap()
+                self.last_checkpoint = self.checkpoints()[-1]
+
+    def checkpoint_path(self, sequence):
+        return os.path.join(self.journal_dir, f"checkpoint-{sequence:08d}.xml")
+
+    def checkpoints(self):
+        """Gibt die vorhandenen Checkpoints als sortierte Liste von Sequenznummern zurück."""
+        sequences = []
+        for file_name in os.listdir(self.journal_dir):
+            match = CHECKPOINT_PATTERN.match(file_name)
+            if match:
+                sequences.append(int(match.group(1)))
+        return sorted(sequences)
+
+    def iter_records(self, after=0, until=None):
+        """Liest die Journal-Datensätze mit after < seq <= until."""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Unvollständige letzte Zeile nach Absturz ignorieren
+                    continue
+                if record["seq"] <= after:
+                    continue
+                if until is not None and record["seq"] > until:
+                    break
+                yield record
+
+    def last_sequence(self):
+        sequence = 0
+        for record in self.iter_records():
+            sequence = record["seq"]
+        return max(sequence, self.last_checkpoint or 0)
+
+    def bootstrap(self):
+        # Erster Checkpoint aus dem aktuellen Katalog (products-<Zeitstempel>.xml)
+        tree = self.manager.load_xml(self.manager.get_latest_xml_file())
+        self.write_checkpoint(tree, self.sequence)
+
+    def write_checkpoint(self, tree, sequence):
+        # save_xml schreibt selbst atomar und merkt sich den Hash unter dem endgültigen Namen
+        path = self.checkpoint_path(sequence)
+        self.manager.save_xml(tree, path)
+        self.last_checkpoint = max(sequence, self.last_checkpoint or 0)
+        return path
+
+    def rebuild(self, sequence=None):
+        """Stellt den Katalog zum Stand sequence (Standard: aktuell) als ElementTree wieder her."""
+        if sequence is None:
+            sequence = self.sequence
+        base = max((s for s in self.checkpoints() if s <= sequence), default=None)
+        if base is None:
+            raise ValueError(f"Kein Checkpoint für Stand {sequence} vorhanden")
+        tree = ET.parse(self.checkpoint_path(base))
+        for record in self.iter_records(after=base, until=sequence):
+            if record["op"] == "add":
+                self.manager.add_product(tree, record["name"], record["description"],
+                                         [tuple(step) for step in record["steps"]], verbose=False)
+        return tree
+
+    def current_tree(self):
+        if self._tree is None:
+            self._tree = self.rebuild()
+        return self._tree
+
+    def catch_up(self):
+        """Übernimmt Datensätze, die andere Prozesse inzwischen angehängt haben (unter der Sperre aufrufen)."""
+        tree = self.current_tree()
+        for record in self.iter_records(after=self.sequence):
+            if record["op"] == "add":
+                self.manager.add_product(tree, record["name"], record["description"],
+                                         [tuple(step) for step in record["steps"]], verbose=False)
+            self.sequence = record["seq"]
+        checkpoints = self.checkpoints()
+        if checkpoints:
+            self.last_checkpoint = max(checkpoints[-1], self.last_checkpoint or 0)
+        return tree
+
+    def add_product(self, product_name, product_description, steps):
+        """Hängt das Produkt als Datensatz an das Journal an. Gibt False zurück, wenn es schon existiert.
+
+        Prüfen und Anhängen laufen unter einer Sperre, damit zwei Stationen nie dieselbe
+        Sequenznummer vergeben. Wirft ValueError, wenn die Angaben nicht in XML geschrieben
+        werden können; sonst wären alle späteren Checkpoints unlesbar.
+        """
+        check_product_text(product_name, product_description, steps)
+        with file_lock(self.lock_path):
+            return self._add_product(product_name, product_description, steps)
+
+    def _add_product(self, product_name, product_description, steps):
+        tree = self.catch_up()
+        if self.manager.product_exists(tree, product_name, steps):
+            print(f"Produkt '{product_name}' existiert bereits.")
+            return False
+
+        record = {
+            "seq": self.sequence + 1,
+            "op": "add",
+            "time": datetime.now().isoformat(timespec="milliseconds"),
+            "name": product_name,
+            "description": product_description,
+            "steps": [[function, parameter, description] for function, parameter, description in steps],
+        }
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.sequence += 1
+        new_product = self.manager.add_product(tree, product_name, product_description, steps)
+        # Zwischen den Checkpoints wird nur das neue Produkt geprüft
+        if not self.manager.validate_products([new_product]):
+            print("Warnung: Das Produkt entspricht nicht dem XSD-Schema!")
+
+        if self.sequence - self.last_checkpoint >= self.checkpoint_interval:
+            self._checkpoint()
+        return True
+
+    def checkpoint(self):
+        """Schreibt den aktuellen Stand als vollständigen XML-Checkpoint und prüft ihn komplett."""
+        with file_lock(self.lock_path):
+            return self._checkpoint()
+
+    def _checkpoint(self):
+        tree = self.catch_up()
+        path = self.write_checkpoint(tree, self.sequence)
+        print(f"Checkpoint geschrieben: {path}")
+        if not self.manager.validate_xml(tree):
+            print("Warnung: Der Checkpoint entspricht nicht dem XSD-Schema!")
+        return path
+
+    def export(self, target_path, sequence=None):
+        """Schreibt einen beliebigen Stand als products.xml-kompatible Datei."""
+        tree = self.current_tree() if sequence is None else self.rebuild(sequence)
+        self.manager.save_xml(tree, target_path)
+        return target_path
@@ -0,0 +1,1122 @@
+"""Produktkatalog (products.xml) der Industrie 4.0 Anlage: Laden, Prüfen und Schreiben.
+
+Das Modul kommt ohne PyQt6 aus und wird von der Oberfläche (QuickLoad.py) und der
+Kommandozeile (quickload_cli.py) gemeinsam genutzt.
+"""
+import xml.etree.ElementTree as ET
+import io
+import os
+import re
+import json
+import csv
+import hashlib
+import functools
+from datetime import datetime
+
+from catalog_commit import LOCK_FILE, file_lock
+from catalog_metrics import NULL_METRICS
+
+# Prozessweiter Cache für kompilierte XSD-Schemata: (Pfad, mtime) -> XMLSchema
+_SCHEMA_CACHE = {}
+
+
+def get_compiled_schema(xsd_file):
+    """Gibt das kompilierte Schema zurück und kompiliert es nur bei Änderung der XSD-Datei neu."""
+    path = os.path.abspath(xsd_file)
+    key = (path, os.path.getmtime(path))
+    schema = _SCHEMA_CACHE.get(key)
+    if schema is None:
+        # Erst bei Bedarf importieren, damit Aufrufe ohne Validierung schnell starten
+        import xmlschema
+        schema = xmlschema.XMLSchema(path)
+        # Veraltete Versionen derselben XSD-Datei verwerfen
+        for old_key in [k for k in _SCHEMA_CACHE if k[0] == path]:
+            del _SCHEMA_CACHE[old_key]
+        _SCHEMA_CACHE[key] = schema
+    return schema
+
+
+def get_product_schema(xsd_file):
+    """Gibt die XSD-Deklaration des Product-Elements zurück (für die Prüfung einzelner Produkte)."""
+    return get_compiled_schema(xsd_file).find("Products/Product")
+
+
+def workplan_hash(steps):
+    """Kanonischer Hash eines Arbeitsplans aus (Function, Parameter, FunctionDescription)-Schritten."""
+    h = hashlib.sha1()
+    for function, parameter, description in steps:
+        h.update(f"{function or ''}\x1f{parameter if parameter is not None else ''}\x1f{description or ''}\x1e".encode("utf-8"))
+    return h.hexdigest()
+
+
+def product_hash(product_name, product_description, plan_digest):
+    """Kanonischer Hash eines Produkts aus Name, Beschreibung und workplan_hash."""
+    return hashlib.sha1(f"{product_name or ''}\x1f{product_description or ''}\x1f{plan_digest}".encode("utf-8")).hexdigest()
+
+
+def catalog_seed(attrib):
+    # Startwert des Katalog-Hashes: die Attribute des Products-Elements
+    return hashlib.sha256("\x1f".join(f"{k}={v}" for k, v in sorted(attrib.items())).encode("utf-8")).hexdigest()
+
+
+def chain_hash(catalog_hash, product_digest):
+    """Kanonischer Katalog-Hash nach dem Anhängen eines Produkts (O(1) pro Änderung)."""
+    return hashlib.sha256(f"{catalog_hash}{product_digest}".encode("ascii")).hexdigest()
+
+
+def element_steps(product):
+    """Liest die Schritte eines Product-Elements als (Function, Parameter, FunctionDescription)-Tupel."""
+    workplan = product.find("Workplan")
+    if workplan is None:
+        return None
+    return [
+        (step.findtext("Function") or "", step.findtext("Parameter") or "",
+         step.findtext("FunctionDescription") or "")
+        for step in workplan.findall("Step")
+    ]
+
+
+# Zeichen, die in XML 1.0 nicht vorkommen dürfen (Steuerzeichen außer Tab/LF/CR, Surrogate, U+FFFE/U+FFFF)
+_ILLEGAL_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+
+def check_xml_text(value, label):
+    """Wirft ValueError, wenn value Zeichen enthält, die eine XML-Datei unlesbar machen würden."""
+    if value is None:
+        return
+    match = _ILLEGAL_XML_CHARS.search(str(value))
+    if match:
+        raise ValueError(f"{label} enthält ein in XML nicht erlaubtes Zeichen "
+                         f"(U+{ord(match.group()):04X}): {value!r}")
+
+
+def check_product_text(product_name, product_description, steps):
+    # Vor dem Schreiben prüfen: ElementTree übernimmt solche Zeichen ungeprüft in die Datei,
+    # die danach beim Laden nicht mehr gelesen werden kann
+    check_xml_text(product_name, "Produktname")
+    check_xml_text(product_description, "Produktbeschreibung")
+    for function, _, description in steps:
+        check_xml_text(function, "Funktion")
+        check_xml_text(description, "Funktionsbeschreibung")
+
+
+def build_product_element(product_name, product_description, steps):
+    """Erzeugt ein Product-Element mit Workplan aus (Function, Parameter, FunctionDescription)-Schritten."""
+    check_product_text(product_name, product_description, steps)
+    new_product = ET.Element("Product")
+    ET.SubElement(new_product, "ProductName").text = product_name
+    ET.SubElement(new_product, "ProductDescription").text = product_description  # Beschreibung hinzufügen
+    workplan = ET.SubElement(new_product, "Workplan")
+
+    # Anzahl existierender Schritte zählen
+    existing_steps_count = len(workplan.findall("Step"))
+    # Berechne den Startwert für die neuen Schritte
+    start_step_number = (existing_steps_count + 1) * 10
+    # Zählvariable für die Schritte
+    step_counter = 0
+
+    for step_number, (function, parameter, description) in enumerate(steps):
+        step_number = start_step_number + (step_counter * 10)  # Schrittzahl in 10er Schritten
+        step = ET.SubElement(workplan, "Step")
+        ET.SubElement(step, "Number").text = str(step_number)
+        ET.SubElement(step, "Function").text = function
+        ET.SubElement(step, "Parameter").text = str(parameter)
+        ET.SubElement(step, "FunctionDescription").text = description
+        step_counter += 1  # Erhöhe den Zähler nach jedem Schritt
+    return new_product
+
+
+def _escape_xml(data):
+    # Gleiche Maskierung wie minidom.toprettyxml (auch für Attribute)
+    return data.replace("&", "&amp;").replace("<", "&lt;").replace("\"", "&quot;").replace(">", "&gt;")
+
+
+def _normalize_text(data):
+    # Zeilenenden wie beim erneuten Parsen durch expat vereinheitlichen
+    return data.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def write_start_tag(writer, element, indent=""):
+    # Öffnendes Tag ohne abschließendes ">" (für leere Elemente folgt "/>")
+    writer.write(f"{indent}<{element.tag}")
+    for name, value in element.attrib.items():
+        writer.write(f' {name}="{_escape_xml(value)}"')
+
+
+def write_pretty_element(writer, element, indent="", addindent="  ", newl="\n"):
+    """Schreibt ein Element eingerückt wie minidom.toprettyxml, ohne Zwischenkopie des Dokuments."""
+    write_start_tag(writer, element, indent)
+
+    # Reine Leerraum-Textknoten entfallen, wie bisher in save_xml
+    children = []
+    if element.text and element.text.strip():
+        children.append(element.text)
+    for child in element:
+        children.append(child)
+        if child.tail and child.tail.strip():
+            children.append(child.tail)
+
+    if not children:
+        writer.write(f"/>{newl}")
+        return
+    writer.write(">")
+    if len(children) == 1 and isinstance(children[0], str):
+        writer.write(_escape_xml(_normalize_text(children[0])))
+    else:
+        writer.write(newl)
+        for child in children:
+            if isinstance(child, str):
+                writer.write(_escape_xml(f"{indent}{addindent}{_normalize_text(child)}{newl}"))
+            else:
+                write_pretty_element(writer, child, indent + addindent, addindent, newl)
+        writer.write(indent)
+    writer.write(f"</{element.tag}>{newl}")
+
+
+def write_text_element(writer, tag, text, indent="", newl="\n"):
+    """Schreibt ein Element ohne Kinder im selben Format wie write_pretty_element."""
+    if text and text.strip():
+        writer.write(f"{indent}<{tag}>{_escape_xml(_normalize_text(text))}</{tag}>{newl}")
+    else:
+        writer.write(f"{indent}<{tag}/>{newl}")
+
+
+def write_pretty_xml(writer, root, addindent="  ", newl="\n"):
+    """Schreibt das komplette Dokument in einem Durchgang in writer."""
+    writer.write(f'<?xml version="1.0" ?>{newl}')
+    write_pretty_element(writer, root, "", addindent, newl)
+
+
+def iter_product_elements(file_path):
+    """Liest eine Katalogdatei mit iterparse und liefert (Wurzel, Product-Element) nacheinander.
+
+    Jedes Product-Element ist nur bis zum nächsten Schritt gültig und wird danach aus
+    der Wurzel entfernt, damit der Speicherbedarf unabhängig von der Dateigröße bleibt.
+    """
+    root = None
+    depth = 0
+    for event, element in ET.iterparse(file_path, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1 and element.tag == "Product":
+            yield root, element
+            del root[:]
+
+
+def iter_products(file_path):
+    """Liefert die Produkte einer Katalogdatei als (Name, Beschreibung, Schritte) ohne den ganzen Baum aufzubauen."""
+    for _, product in iter_product_elements(file_path):
+        yield product.findtext("ProductName"), product.findtext("ProductDescription"), element_steps(product)
+
+
+def export_streaming(source_path, target_path):
+    """Schreibt einen Katalog Produkt für Produkt formatiert in eine neue Datei und gibt den SHA-256 zurück.
+
+    Wie save_xml erst in eine temporäre Datei, dann atomar ersetzen.
+    """
+    temp_path = target_path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            writer = HashingWriter(f)
+            writer.write('<?xml version="1.0" ?>\n')
+            root = None
+            started = False
+            for root, product in iter_product_elements(source_path):
+                if not started:
+                    write_start_tag(writer, root)
+                    writer.write(">\n")
+                    started = True
+                write_pretty_element(writer, product, "  ")
+            if root is None:
+                # Katalog ohne Produkte: nur die Wurzel mit ihren Attributen übernehmen
+                root = ET.parse(source_path).getroot()
+                write_pretty_element(writer, ET.Element(root.tag, root.attrib))
+            else:
+                writer.write(f"</{root.tag}>\n")
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, target_path)
+    return writer.hexdigest()
+
+
+# Funktionscodes der Anlage und ihre FunctionDescription im XML
+FUNCTION_DESCRIPTIONS = {
+    "RR": "release red workpiece",
+    "RB": "release black workpiece",
+    "RS": "release silver workpiece",
+    "MC": "mount cap",
+    "CC": "check colour",
+    "SN": "national distribution",
+    "SI": "international distribution",
+}
+
+
+def parse_steps(value):
+    """Wandelt Schrittangaben in (Function, Parameter, FunctionDescription)-Tupel um.
+
+    Erlaubt sind ein Text wie "RR|MC:1|SI" oder eine Liste aus Codes ("RR", "RR:2"),
+    Listen [Code, Parameter, Beschreibung] bzw. Dicts mit function/parameter/description.
+    """
+    if isinstance(value, str):
+        value = [item for item in re.split(r"[|\s]+", value) if item]
+    steps = []
+    for item in value:
+        if isinstance(item, str):
+            function, _, parameter = item.partition(":")
+            item = (function, parameter or 1)
+        elif isinstance(item, dict):
+            item = (item.get("function"), item.get("parameter", 1), item.get("description"))
+        function = str(item[0]).strip().upper()
+        parameter = int(item[1]) if len(item) > 1 else 1
+        description = item[2] if len(item) > 2 and item[2] else FUNCTION_DESCRIPTIONS.get(function)
+        if not function or description is None:
+            raise ValueError(f"Unbekannter Schritt: {item!r}")
+        check_xml_text(function, "Funktion")
+        check_xml_text(description, "Funktionsbeschreibung")
+        steps.append((function, parameter, description))
+    return steps
+
+
+def sniff_csv_dialect(sample):
+    """Erkennt das Trennzeichen (, ; oder Tab); bei nur einer Spalte gilt das Standardformat."""
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        return csv.excel
+
+
+def read_product_records(file_path):
+    """Liest Produkte aus einer CSV- oder JSON-Datei als (Name, Beschreibung, Schritte)-Tupel.
+
+    CSV: Spalten name, description, steps (Trennzeichen , ; oder Tab).
+    JSON: Liste von Objekten mit name, description und steps.
+    """
+    if file_path.lower().endswith(".json"):
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return [(item.get("name"), item.get("description", ""), item.get("steps", [])) for item in data]
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        dialect = sniff_csv_dialect(sample)
+        return [(row.get("name"), row.get("description") or "", row.get("steps") or "")
+                for row in csv.DictReader(f, dialect=dialect)]
+
+
+def parse_records(records):
+    """Prüft Datensätze (Name, Beschreibung, Schritte) für die Bulk-Importe.
+
+    Gibt (Produkte, Ergebnisse) zurück: Produkte als (index, Name, Beschreibung, Schritte),
+    Ergebnisse mit einem "invalid"-Eintrag samt Meldung je fehlerhaftem Datensatz.
+    """
+    products = []
+    results = []
+    for index, record in enumerate(records):
+        try:
+            product_name, product_description, steps = record
+            steps = parse_steps(steps)
+            if not product_name or not steps:
+                raise ValueError("Produktname und Schritte dürfen nicht leer sein")
+            check_product_text(product_name, product_description, steps)
+        except (ValueError, TypeError) as e:
+            name = record[0] if isinstance(record, (tuple, list)) and record else None
+            results.append({"index": index, "name": name, "status": "invalid", "message": str(e)})
+            continue
+        products.append((index, product_name, product_description, steps))
+    return products, results
+
+
+class HashingWriter:
+    """Schreibt Text in eine Datei und berechnet dabei den SHA-256 des Inhalts."""
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+        self.bytes_written = 0
+
+    def write(self, data):
+        self.f.write(data)
+        encoded = data.encode("utf-8")
+        self.sha256.update(encoded)
+        self.bytes_written += len(encoded)
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+
+def file_content_hash(file_path):
+    # Textmodus: gleicher Hash unabhängig von den Zeilenenden der Plattform
+    h = hashlib.sha256()
+    with open(file_path, "r", encoding="utf-8") as f:
+        for chunk in iter(lambda: f.read(1 << 16), ""):
+            h.update(chunk.encode("utf-8"))
+    return h.hexdigest()
+
+
+# Aktueller Stand (klein, wird bei jedem Speichern ersetzt) und Verlauf aller Speichervorgänge (nur angehängt)
+HEAD_FILE = "products-head.json"
+HISTORY_FILE = "products-history.jsonl"
+# Bekannte Hashes geschriebener Dateien im Katalogverzeichnis: absoluter Pfad -> Größe, mtime, SHA-256, kanonischer Hash
+HASH_CACHE_FILE = "products-hashes.json"
+SNAPSHOT_PATTERN = re.compile(r"^products-(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}-\d{3})\.xml$")
+
+
+def snapshot_timestamp(file_name):
+    """Liest den Zeitstempel aus dem Dateinamen products-<Zeitstempel>.xml (None wenn keiner enthalten ist)."""
+    match = SNAPSHOT_PATTERN.match(file_name)
+    if match is None:
+        return None
+    return datetime.strptime(match.group(1) + "000", "%Y-%m-%d_%H-%M-%S-%f")
+
+
+def _no_progress(phase, value):
+    pass
+
+
+def instrumented_operation(name):
+    """Misst die Methode als eine Operation in self.metrics (Logzeile, Hooks, Prometheus)."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.operation(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ProductXMLManager:
+    def __init__(self, xsd_file="products.xsd", streaming=False, metrics=None, validation="incremental",
+                 store=None, group_commit=False, deploy_dir=None, compact=False):
+        self.xsd_file = xsd_file
+        # compact=True: main() arbeitet auf dem kompakten ProductCatalog statt auf ElementTree-Elementen
+        self.compact = compact
+        # deploy_dir: Settings-Ordner der MiniMES-Software für deploy() (Standard: $QUICKLOAD_DEPLOY_DIR)
+        self.deploy_dir = deploy_dir or os.environ.get("QUICKLOAD_DEPLOY_DIR")
+        # group_commit=True: main() reicht Produkte an einen GroupCommitter weiter, der gleichzeitig
+        # eintreffende Produkte (aus mehreren Threads oder von mehreren Stationen) gemeinsam schreibt;
+        # das funktioniert mit jedem Dateimodus (ElementTree, streaming, compact), nicht mit store
+        self.group_commit = group_commit
+        self._committer = None
+        # store: catalog_store.CatalogStore; Produkte liegen dann in SQLite statt in den XML-Dateien,
+        # die products.xml entsteht nur noch über export_store
+        self.store = store
+        # validation="incremental": nach dem Speichern nur die neuen Product-Elemente prüfen,
+        # die übrige Datei wurde beim Laden bzw. beim vorherigen Speichern bereits geprüft.
+        # validation="full": nach dem Speichern immer das ganze Dokument prüfen.
+        if validation not in ("incremental", "full"):
+            raise ValueError(f"Unbekannter Validierungsmodus: {validation}")
+        self.validation = validation
+        if sum((store is not None, bool(streaming), bool(compact))) > 1:
+            raise ValueError("store, streaming und compact schließen sich gegenseitig aus")
+        # streaming=True: Katalog nie komplett in den Speicher laden (für sehr große Dateien)
+        self.streaming = streaming
+        # metrics: catalog_metrics.CatalogMetrics für Zeitmessung und Zähler (Standard: aus)
+        self.metrics = metrics or NULL_METRICS
+        # Index des zuletzt geladenen Baums: Produktname -> Menge der Arbeitsplan-Hashes
+        self._index_tree = None
+        self._index = {}
+        # Kanonischer Hash des zuletzt geladenen Baums, wird bei add_product fortgeschrieben
+        self._canonical_tree = None
+        self._canonical = None
+
+    def locked(self, project_dir=None):
+        """Sperrt den Katalog im Verzeichnis gegen gleichzeitige Änderungen anderer Prozesse."""
+        return file_lock(os.path.join(project_dir or os.getcwd(), LOCK_FILE))
+
+    def hash_cache_path(self):
+        # Ein Cache im Katalogverzeichnis für alle geschriebenen Dateien, auch für Exporte in
+        # andere Ordner (z.B. den Settings-Ordner der MiniMES-Software), die sauber bleiben sollen
+        return os.path.join(os.getcwd(), HASH_CACHE_FILE)
+
+    def load_hash_cache(self):
+        try:
+            with open(self.hash_cache_path(), "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def write_hash_cache(self, cache):
+        # Einträge zu gelöschten oder umbenannten Dateien verwerfen
+        cache = {path: entry for path, entry in cache.items() if os.path.exists(path)}
+        path = self.hash_cache_path()
+        # Eigener Name je Prozess: Exporte und Journal schreiben den Cache auch ohne Katalogsperre
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def cached_hash(self, file_path):
+        """Gespeicherte Hashes der Datei, solange Größe und Änderungszeit unverändert sind (sonst None)."""
+        file_path = os.path.abspath(file_path)
+        entry = self.load_hash_cache().get(file_path)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+            return None
+        return entry
+
+    def remember_hash(self, file_path, content_hash, canonical=None):
+        file_path = os.path.abspath(file_path)
+        cache = self.load_hash_cache()
+        stat = os.stat(file_path)
+        cache[file_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                            "sha256": content_hash, "canonical": canonical}
+        self.write_hash_cache(cache)
+
+    def canonical_hash(self, tree):
+        """Kanonischer Hash des Katalogs; wird nur einmal pro geladenem Baum berechnet."""
+        if self._canonical_tree is not tree:
+            root = tree.getroot()
+            canonical = catalog_seed(root.attrib)
+            for product in root.findall("Product"):
+                canonical = chain_hash(canonical, product_hash(
+                    product.findtext("ProductName"), product.findtext("ProductDescription"),
+                    workplan_hash(element_steps(product) or [])))
+            self._canonical_tree = tree
+            self._canonical = canonical
+        return self._canonical
+
+    def head_path(self, project_dir=None):
+        return os.path.join(project_dir or os.getcwd(), HEAD_FILE)
+
+    def load_head(self, project_dir=None):
+        """Eintrag des aktuellen Stands: file, previous, size, sha256, dir_mtime_ns (None, wenn unbekannt)."""
+        try:
+            with open(self.head_path(project_dir), "r", encoding="utf-8") as f:
+                head = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return head if isinstance(head, dict) else None
+
+    def write_head(self, head, project_dir=None):
+        # Der Head merkt sich die Änderungszeit des Verzeichnisses. Er wird deshalb im Platz
+        # überschrieben statt über eine temporäre Datei ersetzt, denn Anlegen und Umbenennen
+        # ändern diese Zeit. Ein halb geschriebener Head ist ungültiges JSON und führt nur
+        # zum Neuaufbau über rebuild_head. Muss die letzte Änderung im Verzeichnis sein.
+        project_dir = project_dir or os.getcwd()
+        path = self.head_path(project_dir)
+        if not os.path.exists(path):
+            open(path, "w").close()
+        head = dict(head, dir_mtime_ns=os.stat(project_dir).st_mtime_ns)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(head, f, indent=2, ensure_ascii=False)
+
+    def head_is_current(self, head, project_dir=None):
+        # Ein stat des Verzeichnisses: jede neue, gelöschte oder umbenannte Datei (z.B. eine
+        # hineinkopierte products-<Zeitstempel>.xml) ändert dessen Änderungszeit
+        if not head.get("file") or head.get("dir_mtime_ns") is None:
+            return False
+        try:
+            return os.stat(project_dir or os.getcwd()).st_mtime_ns == head["dir_mtime_ns"]
+        except OSError:
+            return False
+
+    def rebuild_head(self, project_dir=None):
+        """Bestimmt den Head aus den Zeitstempeln in den Dateinamen neu.
+
+        Schreibt nichts, damit Lesebefehle den Head nicht verändern; gespeichert wird er
+        erst beim nächsten Speichern (record_snapshot). sha256 fehlt, deploy berechnet ihn dann selbst.
+        """
+        project_dir = project_dir or os.getcwd()
+        files = [f for f in os.listdir(project_dir) if f.startswith("products") and f.endswith(".xml")]
+        if not files:
+            return {"file": None}
+        # Dateien ohne Zeitstempel (z.B. products.xml) gelten als älteste
+        file_name = max(files, key=lambda f: (snapshot_timestamp(f) or datetime.min, f))
+        return {"file": file_name, "previous": None, "size": os.path.getsize(os.path.join(project_dir, file_name))}
+
+    def get_latest_xml_file(self):
+        project_dir = os.getcwd()
+        with self.metrics.phase("get_latest_xml_file"):
+            head = self.load_head(project_dir)
+            if head is None or not self.head_is_current(head, project_dir):
+                head = self.rebuild_head(project_dir)
+        if not head["file"]:
+            return os.path.join(project_dir, "products.xml")
+        return os.path.join(project_dir, head["file"])
+
+    def validate_xml(self, xml_source):
+        # xml_source: Dateipfad oder bereits geparstes Element/ElementTree
+        if not os.path.exists(self.xsd_file):
+            print("XSD-Datei nicht gefunden. Überspringe Validierung.")
+            return True
+        with self.metrics.phase("schema"):
+            schema = get_compiled_schema(self.xsd_file)
+        with self.metrics.phase("validate"):
+            if (self.streaming or self.compact) and isinstance(xml_source, str):
+                # Lazy-Ressource: xmlschema validiert per iterparse statt über den ganzen Baum
+                from xmlschema import XMLResource
+                xml_source = XMLResource(xml_source, lazy=True)
+            valid = schema.is_valid(xml_source)
+        self.metrics.count("validations")
+        if not valid:
+            self.metrics.count("validation_failures")
+        return valid
+
+    def validate_products(self, products):
+        """Prüft nur die übergebenen Product-Elemente gegen die Product-Deklaration des Schemas."""
+        if not os.path.exists(self.xsd_file):
+            print("XSD-Datei nicht gefunden. Überspringe Validierung.")
+            return True
+        with self.metrics.phase("schema"):
+            product_schema = get_product_schema(self.xsd_file)
+        with self.metrics.phase("validate_products"):
+            valid = all(product_schema.is_valid(product) for product in products)
+        self.metrics.count("product_validations", len(products))
+        if not valid:
+            self.metrics.count("validation_failures")
+        return valid
+
+    def validate_saved(self, tree_or_file, new_products):
+        # Prüfung nach dem Speichern je nach Modus: nur die Änderung oder das ganze Dokument
+        if self.validation == "incremental":
+            return self.validate_products(new_products)
+        return self.validate_xml(tree_or_file)
+
+    def new_tree(self, file_path):
+        root = ET.Element("Products", Version="1.0", Creator="Festo Didactic")
+        tree = ET.ElementTree(root)
+        tree.write(file_path, encoding="utf-8", xml_declaration=True)
+        return tree
+
+    def load_xml(self, file_path):
+        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+            print("XML-Datei nicht gefunden oder leer. Neue wird erstellt.")
+            return self.new_tree(file_path)
+        # Datei nur einmal lesen: Parsen und Validieren arbeiten auf demselben Puffer
+        with self.metrics.phase("read"):
+            with open(file_path, "rb") as f:
+                data = f.read()
+        self.metrics.count("bytes_read", len(data))
+        # Eine unlesbare Datei wird nie durch einen leeren Katalog ersetzt, sonst wären alle Produkte weg
+        try:
+            with self.metrics.phase("parse"):
+                tree = ET.ElementTree(ET.fromstring(data))
+        except ET.ParseError as e:
+            raise ValueError(f"Katalogdatei ist kein gültiges XML und bleibt unverändert: {file_path} ({e})")
+        # Ein leeres <Products/> (z.B. von new_tree) ist laut XSD ungültig, aber ein gültiger Anfang
+        if tree.getroot().find("Product") is not None and not self.validate_xml(tree):
+            raise ValueError(f"Katalogdatei entspricht nicht dem XSD-Schema und bleibt unverändert: {file_path}")
+        entry = self.cached_hash(file_path)
+        if entry and entry.get("canonical"):
+            # Unveränderte Datei: kanonischen Hash übernehmen statt neu zu berechnen
+            self._canonical_tree = tree
+            self._canonical = entry["canonical"]
+        return tree
+
+    def check_catalog_file(self, file_path):
+        """Wie load_xml, aber ohne den Baum aufzubauen (für streaming und compact).
+
+        Wirft ValueError, wenn die Datei nicht gelesen werden kann oder nicht dem Schema entspricht.
+        """
+        try:
+            if self.validate_xml(file_path) or next(iter_product_elements(file_path), None) is None:
+                return
+        except ET.ParseError as e:
+            raise ValueError(f"Katalogdatei ist kein gültiges XML und bleibt unverändert: {file_path} ({e})")
+        raise ValueError(f"Katalogdatei entspricht nicht dem XSD-Schema und bleibt unverändert: {file_path}")
+
+    def build_index(self, tree):
+        index = {}
+        for product in tree.getroot().findall("Product"):
+            name = product.findtext("ProductName")
+            steps = element_steps(product)
+            if name is None or steps is None:
+                continue
+            index.setdefault(name, set()).add(workplan_hash(steps))
+        self._index_tree = tree
+        self._index = index
+        return index
+
+    def get_index(self, tree):
+        # Index wird nur einmal pro geladenem Baum aufgebaut
+        if self._index_tree is not tree:
+            self.build_index(tree)
+        return self._index
+
+    def product_exists(self, tree, product_name, steps):
+        hashes = self.get_index(tree).get(product_name)
+        return hashes is not None and workplan_hash(steps) in hashes
+
+    def build_index_streaming(self, file_path):
+        """Wie build_index, liest die Datei aber per iterparse (nur der Index liegt im Speicher)."""
+        index = {}
+        with self.metrics.phase("build_index"):
+            for name, _, steps in iter_products(file_path):
+                if name is not None and steps is not None:
+                    index.setdefault(name, set()).add(workplan_hash(steps))
+        return index
+
+    def append_products_streaming(self, file_path, new_products):
+        """Hängt Product-Elemente an, ohne den Katalog in den Speicher zu laden.
+
+        Die Datei wird bis vor </Products> blockweise in eine temporäre Datei kopiert,
+        dahinter kommen die neuen Produkte und das schließende Tag; danach wird atomar
+        ersetzt. Leser ohne Sperre und ein Absturz sehen nie einen abgeschnittenen Katalog.
+        """
+        fragment = io.StringIO()
+        for new_product in new_products:
+            write_pretty_element(fragment, new_product, "  ")
+        with self.metrics.phase("append_tail"):
+            with open(file_path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                f.seek(max(0, size - 4096))
+                tail = f.read()
+            position = tail.rfind(b"</Products>")
+            if position >= 0:
+                newl = "\r\n" if b"\r\n" in tail else "\n"
+                text = fragment.getvalue()
+                if not tail[:position].endswith(b"\n"):
+                    text = "\n" + text
+                data = (text + "</Products>\n").replace("\n", newl).encode("utf-8")
+                remaining = size - len(tail) + position
+                temp_path = file_path + ".tmp"
+                with open(file_path, "rb") as source, open(temp_path, "wb") as target:
+                    while remaining:
+                        chunk = source.read(min(1 << 20, remaining))
+                        target.write(chunk)
+                        remaining -= len(chunk)
+                    target.write(data)
+                os.replace(temp_path, file_path)
+                self.metrics.count("bytes_written", size - len(tail) + position + len(data))
+                return
+        # Leerer Katalog (<Products/>): die kleine Datei komplett neu schreiben
+        tree = self.load_xml(file_path)
+        tree.getroot().extend(new_products)
+        self.save_xml(tree, file_path)
+
+    def add_product(self, tree, product_name, product_description, steps, verbose=True):
+        new_product = build_product_element(product_name, product_description, steps)
+        tree.getroot().append(new_product)
+        self.get_index(tree).setdefault(product_name, set()).add(workplan_hash(steps))
+        if self._canonical_tree is tree:
+            self._canonical = chain_hash(self._canonical,
+                                         product_hash(product_name, product_description, workplan_hash(steps)))
+        if verbose:
+            print(f"Produkt '{product_name}' wurde hinzugefügt.")
+        return new_product
+
+    def load_catalog(self, file_path):
+        """Lädt die Datei als ProductCatalog mit gemeinsam genutzten Arbeitsplänen."""
+        from product_catalog import ProductCatalog
+        return ProductCatalog.from_file(file_path)
+
+    def save_catalog(self, catalog, file_path):
+        entry = self.cached_hash(file_path)
+        if entry and entry.get("canonical") == catalog.canonical:
+            self.metrics.count("writes_skipped")
+            return entry["sha256"]
+        with self.metrics.phase("save_xml"):
+            with open(file_path + ".tmp", "w", encoding="utf-8") as f:
+                writer = HashingWriter(f)
+                catalog.write_xml(writer)
+            os.replace(file_path + ".tmp", file_path)
+        self.metrics.count("bytes_written", writer.bytes_written)
+        self.remember_hash(file_path, writer.hexdigest(), catalog.canonical)
+        return writer.hexdigest()
+
+    def save_xml(self, tree, file_path):
+        # Gibt den SHA-256 des geschriebenen Inhalts zurück (für den Head-Eintrag).
+        # Hat die Datei schon denselben kanonischen Inhalt, wird nichts geschrieben.
+        canonical = self.canonical_hash(tree)
+        entry = self.cached_hash(file_path)
+        if entry and entry.get("canonical") == canonical:
+            self.metrics.count("writes_skipped")
+            return entry["sha256"]
+        # Erst vollständig in eine temporäre Datei schreiben, dann atomar ersetzen.
+        with self.metrics.phase("save_xml"):
+            with open(file_path + ".tmp", "w", encoding="utf-8") as f:
+                writer = HashingWriter(f)
+                write_pretty_xml(writer, tree.getroot())
+            os.replace(file_path + ".tmp", file_path)
+        self.metrics.count("bytes_written", writer.bytes_written)
+        self.remember_hash(file_path, writer.hexdigest(), canonical)
+        return writer.hexdigest()
+
+    def export_file(self, source_path, target_path):
+        """Wie export_streaming, überspringt das Schreiben aber, wenn target_path schon denselben Inhalt hat."""
+        source = self.cached_hash(source_path)
+        target = self.cached_hash(target_path)
+        if source and target and source["sha256"] == target["sha256"]:
+            self.metrics.count("writes_skipped")
+            return target["sha256"]
+        with self.metrics.phase("export"):
+            content_hash = export_streaming(source_path, target_path)
+        self.remember_hash(target_path, content_hash, source.get("canonical") if source else None)
+        return content_hash
+
+    def rename_file(self, file_path, content_hash=None):
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")[:-3]
+        new_file_name = f"products-{timestamp}.xml"
+        project_dir = os.path.dirname(file_path)
+        new_file_path = os.path.join(project_dir, new_file_name)
+        with self.metrics.phase("rename_file"):
+            entry = self.cached_hash(file_path)
+            os.rename(file_path, new_file_path)
+            print(f"Die Datei wurde umbenannt in: {new_file_path}")
+            if entry:
+                # Inhalt unverändert, nur der Name ist neu
+                self.remember_hash(new_file_path, entry["sha256"], entry.get("canonical"))
+            # Zuletzt, siehe write_head
+            self.record_snapshot(new_file_path, os.path.basename(file_path), content_hash)
+        return new_file_path
+
+    def record_snapshot(self, file_path, previous=None, content_hash=None):
+        """Setzt file_path als neuen Head und hängt den Vorgang an den Verlauf an.
+
+        previous ist der Name, den die Datei vor dem Umbenennen hatte; diese Datei gibt
+        es danach nicht mehr, der Verlauf hält nur Namen und Inhalts-Hash fest.
+        """
+        project_dir = os.path.dirname(file_path)
+        head = {
+            "file": os.path.basename(file_path),
+            "previous": previous,
+            "size": os.path.getsize(file_path),
+            "sha256": content_hash or file_content_hash(file_path),
+        }
+        with open(os.path.join(project_dir, HISTORY_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(dict(head, time=datetime.now().isoformat(timespec="milliseconds")),
+                               ensure_ascii=False) + "\n")
+        self.write_head(head, project_dir)
+
+    @instrumented_operation("deploy")
+    def deploy(self, target_dir=None, tree=None, source_name=None):
+        """Veröffentlicht den aktuellen Stand als products.xml im Zielordner (siehe catalog_deploy).
+
+        tree: statt des Heads diesen Stand veröffentlichen (z.B. ProductJournal.current_tree()),
+        source_name: Herkunft für das Deploy-Log.
+        Gibt den Eintrag aus dem Deploy-Log zurück; status ist "deployed" oder "unchanged".
+        """
+        from catalog_deploy import DEPLOY_FILE, DEPLOY_LOG, deploy_file
+        target_dir = target_dir or self.deploy_dir
+        if not target_dir:
+            raise ValueError("Kein Zielordner für die products.xml angegeben (QUICKLOAD_DEPLOY_DIR)")
+        log_path = os.path.join(os.getcwd(), DEPLOY_LOG)
+        with self.metrics.phase("deploy"):
+            if self.store is not None or tree is not None:
+                # Lokal exportieren; auf den Anlagen-PC wird nur kopiert, wenn sich der Inhalt unterscheidet
+                import tempfile
+                handle, temp_path = tempfile.mkstemp(prefix="quickload-", suffix="-" + DEPLOY_FILE)
+                os.close(handle)
+                try:
+                    if tree is not None:
+                        with open(temp_path, "w", encoding="utf-8") as f:
+                            writer = HashingWriter(f)
+                            write_pretty_xml(writer, tree.getroot())
+                        content_hash = writer.hexdigest()
+                    else:
+                        content_hash = self.store.export_xml(temp_path, validate=self.validate_xml)
+                        source_name = source_name or os.path.basename(self.store.db_path)
+                    return deploy_file(temp_path, target_dir, content_hash, log_path, source_name=source_name)
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+            with self.locked():
+                file_path = self.get_latest_xml_file()
+                if not os.path.exists(file_path):
+                    raise ValueError(f"Keine Katalogdatei gefunden: {file_path}")
+                head = self.load_head(os.path.dirname(file_path)) or {}
+                # Der Hash aus dem Head gilt nur, solange die Datei noch dieselbe Größe hat
+                content_hash = (head.get("sha256") if head.get("file") == os.path.basename(file_path)
+                                and head.get("size") == os.path.getsize(file_path) else None)
+                return deploy_file(file_path, target_dir, content_hash or file_content_hash(file_path), log_path)
+
+    @instrumented_operation("main_store")
+    def main_store(self, product_name, product_description, steps, progress=None):
+        # Ungültige Produkte werden gar nicht erst gespeichert, damit jeder Export gültig bleibt
+        report = progress or _no_progress
+        report("prüfen", 20)
+        with self.metrics.phase("duplicate_check"):
+            exists = self.store.product_exists(product_name, steps)
+        if exists:
+            print(f"Produkt '{product_name}' existiert bereits.")
+            report("fertig", 100)
+            return "exists", self.store.db_path
+        report("validieren", 40)
+        if not self.validate_products([build_product_element(product_name, product_description, steps)]):
+            print("Warnung: Das Produkt entspricht nicht dem XSD-Schema und wurde nicht gespeichert!")
+            report("fertig", 100)
+            return "invalid", self.store.db_path
+        report("speichern", 60)
+        with self.metrics.phase("store_insert"):
+            added = self.store.add_product(product_name, product_description, steps)
+        if not added:
+            # Zwischenzeitlich von einem anderen Prozess eingefügt
+            print(f"Produkt '{product_name}' existiert bereits.")
+            report("fertig", 100)
+            return "exists", self.store.db_path
+        self.metrics.count("products_added")
+        print(f"Produkt '{product_name}' wurde hinzugefügt.")
+        report("fertig", 100)
+        return "added", self.store.db_path
+
+    @instrumented_operation("export_store")
+    def export_store(self, target_path):
+        """Schreibt den Katalog aus der Datenbank als geprüfte products.xml (z.B. in den Settings-Ordner)."""
+        with self.metrics.phase("export_xml"):
+            content_hash = self.store.export_xml(target_path, validate=self.validate_xml)
+        print(f"Katalog exportiert nach: {target_path}")
+        return content_hash
+
+    @instrumented_operation("main")
+    def main(self, product_name, product_description, steps, progress=None):
+        """Fügt ein Produkt in den aktuellen Katalog ein.
+
+        progress: optionaler Callback progress(phase, prozent) für Fortschrittsanzeigen.
+        Gibt (status, datei) zurück; status ist "added", "exists" oder "invalid".
+        Wirft ValueError, wenn die Angaben nicht in XML geschrieben werden können oder
+        der vorhandene Katalog unlesbar ist; die Datei bleibt dann unverändert.
+        """
+        check_product_text(product_name, product_description, steps)
+        if self.store is not None:
+            return self.main_store(product_name, product_description, steps, progress)
+        if self.group_commit:
+            return self.main_group_commit(product_name, product_description, steps, progress)
+        if self.streaming:
+            return self.main_streaming(product_name, product_description, steps, progress)
+        if self.compact:
+            return self.main_compact(product_name, product_description, steps, progress)
+        return self.add_single(product_name, product_description, steps, progress)
+
+    @instrumented_operation("main_streaming")
+    def main_streaming(self, product_name, product_description, steps, progress=None):
+        # Katalog nie komplett laden: Duplikate per iterparse, neues Produkt vor </Products> anhängen
+        return self.add_single(product_name, product_description, steps, progress, "streaming")
+
+    @instrumented_operation("main_compact")
+    def main_compact(self, product_name, product_description, steps, progress=None):
+        # Katalog als ProductCatalog im Speicher (ein Bruchteil des Speichers der ElementTree-Elemente)
+        return self.add_single(product_name, product_description, steps, progress, "compact")
+
+    def add_single(self, product_name, product_description, steps, progress=None, mode="tree"):
+        report = progress or _no_progress
+        # Laden bis Umbenennen unter der Sperre, damit kein anderer Prozess dazwischen schreibt;
+        # geprüft wird danach (ein gespeicherter Baum muss nicht erneut gelesen werden)
+        with self.locked():
+            written = self.write_products_locked([(product_name, product_description, steps)], report, mode=mode)
+        status, file_path = self.check_written(written, report)[0]
+        report("fertig", 100)
+        return status, file_path
+
+    def main_group_commit(self, product_name, product_description, steps, progress=None):
+        # Wartet, bis das Produkt zusammen mit den übrigen wartenden (auch anderer Prozesse) geschrieben ist
+        report = progress or _no_progress
+        if self._committer is None:
+            from catalog_commit import GroupCommitter
+            self._committer = GroupCommitter(self)
+        status, file_path = self._committer.submit(product_name, product_description, steps, report)
+        report("fertig", 100)
+        return status, file_path
+
+
+    @instrumented_operation("commit_batch")
+    def commit_batch(self, products, progress=None):
+        """Schreibt mehrere (Name, Beschreibung, Schritte) mit einem Laden, Speichern und Umbenennen.
+
+        Gibt pro Produkt (status, datei) wie main() zurück.
+        """
+        with self.locked():
+            return self.commit_batch_locked(products, progress)
+
+    def commit_batch_locked(self, products, progress=None):
+        # Wie commit_batch, der Aufrufer hält die Sperre bereits. Geprüft wird vor dem
+        # Freigeben, damit die Ergebnisse für andere Prozesse schon feststehen.
+        report = progress or _no_progress
+        return self.check_written(self.write_products_locked(products, report), report)
+
+    def file_mode(self):
+        # Wie die Katalogdatei im Speicher gehalten wird (siehe CATALOG_SESSIONS)
+        return "streaming" if self.streaming else "compact" if self.compact else "tree"
+
+    def write_products_locked(self, products, report=_no_progress, verbose=True, mode=None):
+        """Gemeinsamer Ablauf aller Schreibwege auf die XML-Dateien; der Aufrufer hält die Sperre.
+
+        Lädt den aktuellen Stand, überspringt vorhandene Produkte (auch doppelte im Stapel),
+        hängt die übrigen an, speichert und benennt um. Gibt (statuses, added, file_path,
+        new_file_path, saved) für check_written zurück; new_file_path ist None, wenn nichts
+        geschrieben wurde.
+        """
+        report("laden", 5)
+        file_path = self.get_latest_xml_file()
+        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+            print("XML-Datei nicht gefunden oder leer. Neue wird erstellt.")
+            self.new_tree(file_path)
+        session = CATALOG_SESSIONS[mode or self.file_mode()](self, file_path)
+
+        report("prüfen", 40)
+        statuses = []
+        added = []
+        with self.metrics.phase("duplicate_check_and_add"):
+            for product_name, product_description, steps in products:
+                if session.exists(product_name, steps):
+                    if verbose:
+                        print(f"Produkt '{product_name}' existiert bereits.")
+                    statuses.append("exists")
+                else:
+                    added.append(session.add(product_name, product_description, steps, verbose))
+                    statuses.append("added")
+        self.metrics.count("products_added", len(added))
+        if not added:
+            return statuses, added, file_path, None, None
+
+        report("speichern", 50)
+        content_hash = session.save(file_path)
+        report("umbenennen", 75)
+        new_file_path = self.rename_file(file_path, content_hash)
+        return statuses, added, file_path, new_file_path, session.saved(new_file_path)
+
+    def check_written(self, written, report=_no_progress):
+        """Prüft, was write_products_locked geschrieben hat, und gibt pro Produkt (status, datei) zurück.
+
+        Entspricht die Datei nicht dem Schema, gelten die neuen Produkte als "invalid".
+        """
+        statuses, added, file_path, new_file_path, saved = written
+        if new_file_path is None:
+            return [(status, file_path) for status in statuses]
+        report("validieren", 85)
+        valid = self.validate_saved(saved, added)
+        if not valid:
+            print("Warnung: Die XML-Datei entspricht nicht dem XSD-Schema!")
+        else:
+            print("XML-Datei entspricht dem XSD-Schema!")
+        return [("invalid" if status == "added" and not valid else status, new_file_path) for status in statuses]
+
+    @instrumented_operation("add_products_bulk")
+    def add_products_bulk(self, records):
+        """Fügt viele Produkte mit einem Laden, einem Schreiben und einer Validierung hinzu.
+
+        records: Iterable aus (Name, Beschreibung, Schritte). Gibt pro Datensatz ein Dict
+        mit index, name, status ("added", "exists" oder "invalid") und ggf. message sowie
+        den Pfad der neuen Datei zurück (None, wenn nichts geschrieben wurde).
+        """
+        if self.store is not None:
+            return self.add_products_bulk_store(records)
+        products, results = parse_records(records)
+        with self.locked():
+            written = self.write_products_locked([product[1:] for product in products], verbose=False)
+        print(f"{len(written[1])} von {len(products) + len(results)} Produkten hinzugefügt.")
+        for (index, product_name, _, _), (status, _) in zip(products, self.check_written(written)):
+            result = {"index": index, "name": product_name, "status": status}
+            if status == "invalid":
+                result["message"] = "entspricht nicht dem XSD-Schema"
+            results.append(result)
+        results.sort(key=lambda result: result["index"])
+        return results, written[3]
+
+    @instrumented_operation("add_products_bulk_store")
+    def add_products_bulk_store(self, records):
+        """Wie add_products_bulk, schreibt aber alle neuen Produkte in einer Transaktion in den Store."""
+        products, results = parse_records(records)
+        new_products = []
+        product_schema = None
+        if os.path.exists(self.xsd_file):
+            with self.metrics.phase("schema"):
+                product_schema = get_product_schema(self.xsd_file)
+        with self.metrics.phase("duplicate_check_and_validate"):
+            pending = set()
+            for index, product_name, product_description, steps in products:
+                key = (product_name, workplan_hash(steps))
+                if key in pending or self.store.product_exists(product_name, steps):
+                    results.append({"index": index, "name": product_name, "status": "exists"})
+                    continue
+                element = build_product_element(product_name, product_description, steps)
+                if product_schema is not None and not product_schema.is_valid(element):
+                    results.append({"index": index, "name": product_name, "status": "invalid",
+                                    "message": "entspricht nicht dem XSD-Schema"})
+                    continue
+                pending.add(key)
+                new_products.append((product_name, product_description, steps))
+                results.append({"index": index, "name": product_name, "status": "added"})
+
+        with self.metrics.phase("store_insert"):
+            self.store.add_products(new_products)
+        self.metrics.count("products_added", len(new_products))
+        print(f"{len(new_products)} von {len(results)} Produkten hinzugefügt.")
+        results.sort(key=lambda result: result["index"])
+        return results, (self.store.db_path if new_products else None)
+
+
+class TreeSession:
+    """Katalogdatei als ElementTree (Standard); der gespeicherte Baum wird direkt geprüft."""
+    def __init__(self, manager, file_path):
+        self.manager = manager
+        self.tree = manager.load_xml(file_path)
+
+    def exists(self, product_name, steps):
+        return self.manager.product_exists(self.tree, product_name, steps)
+
+    def add(self, product_name, product_description, steps, verbose):
+        return self.manager.add_product(self.tree, product_name, product_description, steps, verbose)
+
+    def save(self, file_path):
+        return self.manager.save_xml(self.tree, file_path)
+
+    def saved(self, new_file_path):
+        return self.tree
+
+
+class CompactSession:
+    """Katalogdatei als ProductCatalog (wenig Speicher); geprüft wird die Datei per iterparse."""
+    def __init__(self, manager, file_path):
+        self.manager = manager
+        manager.check_catalog_file(file_path)
+        with manager.metrics.phase("parse"):
+            self.catalog = manager.load_catalog(file_path)
+
+    def exists(self, product_name, steps):
+        return self.catalog.product_exists(product_name, steps)
+
+    def add(self, product_name, product_description, steps, verbose):
+        self.catalog.add_product(product_name, product_description, steps)
+        if verbose:
+            print(f"Produkt '{product_name}' wurde hinzugefügt.")
+        # Element nur für die Prüfung der neuen Produkte (validate_products)
+        return build_product_element(product_name, product_description, steps)
+
+    def save(self, file_path):
+        return self.manager.save_catalog(self.catalog, file_path)
+
+    def saved(self, new_file_path):
+        return new_file_path
+
+
+class StreamingSession:
+    """Katalogdatei wird nie komplett geladen: nur ein Index, neue Produkte werden angehängt."""
+    def __init__(self, manager, file_path):
+        self.manager = manager
+        manager.check_catalog_file(file_path)
+        self.index = manager.build_index_streaming(file_path)
+        self.new_products = []
+
+    def exists(self, product_name, steps):
+        return workplan_hash(steps) in self.index.get(product_name, ())
+
+    def add(self, product_name, product_description, steps, verbose):
+        new_product = build_product_element(product_name, product_description, steps)
+        self.new_products.append(new_product)
+        self.index.setdefault(product_name, set()).add(workplan_hash(steps))
+        if verbose:
+            print(f"Produkt '{product_name}' wurde hinzugefügt.")
+        return new_product
+
+    def save(self, file_path):
+        # Der Hash des Inhalts wird beim Umbenennen aus der Datei berechnet
+        self.manager.append_products_streaming(file_path, self.new_products)
+        return None
+
+    def saved(self, new_file_path):
+        return new_file_path
+
+
+CATALOG_SESSIONS = {"tree": TreeSession, "compact": CompactSession, "streaming": StreamingSession}
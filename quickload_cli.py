@@ -0,0 +1,496 @@
+"""Kommandozeile für den Produktkatalog ohne PyQt6.
+
+Beispiele:
+    python quickload_cli.py add "Rote Kappe" "Rote Kappe montiert" "RR|MC|SI"
+    python quickload_cli.py list
+    python quickload_cli.py check
+    python quickload_cli.py search --function CC --function SI
+    python quickload_cli.py search --name Rote --text kappe
+    python quickload_cli.py import produkte.csv
+    python quickload_cli.py export products.xml
+    python quickload_cli.py --store products.sqlite3 import products-2025-07-02_22-03-08-851.xml
+    python quickload_cli.py --store products.sqlite3 export Settings/products.xml
+    python quickload_cli.py audit --workers 4
+    python quickload_cli.py diff products-A.xml products-B.xml
+    python quickload_cli.py merge products-A.xml products-B.xml merged.xml --policy both
+    python quickload_cli.py simulate auftraege.csv --profile zeiten.json
+    python quickload_cli.py schedule auftraege.csv ablaufplan.csv
+    python quickload_cli.py deploy --target "Z:/MPS_MiniMES/Settings"
+    python quickload_cli.py startup
+"""
+import argparse
+import os
+import sys
+
+
+def get_manager(args):
+    # XML- und Schema-Verarbeitung erst laden, wenn ein Befehl sie braucht
+    from product_xml import ProductXMLManager
+    metrics = None
+    if args.metrics_log or args.metrics_file:
+        import logging
+        from catalog_metrics import CatalogMetrics
+        if args.metrics_log:
+            logging.basicConfig(level=logging.INFO, format="%(message)s")
+        metrics = CatalogMetrics(log=args.metrics_log, prometheus_file=args.metrics_file)
+    store = None
+    if args.store:
+        from catalog_store import CatalogStore
+        store = CatalogStore(args.store)
+    return ProductXMLManager(xsd_file=args.xsd, streaming=args.streaming, metrics=metrics,
+                             validation=args.validation, store=store, compact=args.compact)
+
+
+def catalog_file(args, manager):
+    """Katalogdatei für Lesebefehle: --file oder der aktuelle Stand (None mit Meldung, wenn es keine gibt)."""
+    file_path = args.file or manager.get_latest_xml_file()
+    if not os.path.exists(file_path):
+        print(f"Keine Katalogdatei gefunden: {file_path}")
+        return None
+    return file_path
+
+
+def file_error(error, *xml_files):
+    """Einzeilige Meldung für eine fehlende, nicht zugreifbare oder nicht wohlgeformte Datei.
+
+    Bei einem ParseError steht die Datei nicht in der Meldung; dann wird unter xml_files
+    die erste gesucht, die sich nicht lesen lässt (nur im Fehlerfall, daher ohne Zeitverlust).
+    """
+    import xml.etree.ElementTree as ET
+    if isinstance(error, OSError):
+        return f"Dateifehler: {error.filename or ''} ({error.strerror or error})"
+    for file_path in xml_files:
+        try:
+            for _ in ET.iterparse(file_path):
+                pass
+        except (ET.ParseError, OSError) as e:
+            return f"Kein gültiges XML: {file_path} ({e})"
+    return f"Kein gültiges XML: {error}"
+
+
+def get_journal(args, manager):
+    from product_journal import ProductJournal
+    return ProductJournal(args.journal, checkpoint_interval=args.checkpoint_interval, manager=manager)
+
+
+def cmd_add(args):
+    from product_xml import parse_steps
+    manager = get_manager(args)
+    try:
+        steps = parse_steps(args.steps)
+        if args.journal:
+            get_journal(args, manager).add_product(args.name, args.description, steps)
+            return 0
+        status, _ = manager.main(args.name, args.description, steps)
+    except ValueError as e:
+        print(e)
+        return 1
+    return 1 if status == "invalid" else 0
+
+
+def cmd_list(args):
+    import xml.etree.ElementTree as ET
+    from product_xml import element_steps, iter_products
+    manager = get_manager(args)
+    if args.journal and not args.file:
+        for product in get_journal(args, manager).current_tree().getroot().findall("Product"):
+            codes = " ".join(function for function, _, _ in element_steps(product) or [])
+            print(f"{product.findtext('ProductName')}\t{codes}")
+        return 0
+    if manager.store is not None and not args.file:
+        for name, _, steps in manager.store.iter_products():
+            print(f"{name}\t{' '.join(function for _, function, _, _ in steps)}")
+        return 0
+    file_path = catalog_file(args, manager)
+    if file_path is None:
+        return 1
+    # Produkte einzeln lesen, der Katalog wird nie komplett aufgebaut
+    try:
+        for name, _, steps in iter_products(file_path):
+            codes = " ".join(function for function, _, _ in steps or [])
+            print(f"{name}\t{codes}")
+    except (ET.ParseError, OSError) as e:
+        print(file_error(e, file_path))
+        return 1
+    return 0
+
+
+def cmd_search(args):
+    import xml.etree.ElementTree as ET
+    from catalog_search import CatalogSearchIndex
+    manager = get_manager(args)
+    if manager.store is not None and not args.file:
+        # Die Datenbank liefert nummerierte Schritte, der Index erwartet sie wie iter_products ohne Nummer
+        index = CatalogSearchIndex.from_products(
+            (name, description, [step[1:] for step in steps])
+            for name, description, steps in manager.store.iter_products())
+    elif args.journal and not args.file:
+        index = CatalogSearchIndex.from_tree(get_journal(args, manager).current_tree())
+    else:
+        file_path = catalog_file(args, manager)
+        if file_path is None:
+            return 1
+        try:
+            index = CatalogSearchIndex.from_file(file_path)
+        except (ET.ParseError, OSError) as e:
+            print(file_error(e, file_path))
+            return 1
+    results = index.search(args.name, args.function, args.text, args.limit)
+    for name, description, codes in results:
+        print(f"{name}\t{' '.join(codes)}\t{description}")
+    print(f"{len(results)} von {len(index)} Produkten gefunden.")
+    return 0 if results else 1
+
+
+def cmd_check(args):
+    import xml.etree.ElementTree as ET
+    manager = get_manager(args)
+    if args.journal and not args.files:
+        # Aktuellen Stand aus Checkpoint und Journal prüfen
+        valid = manager.validate_xml(get_journal(args, manager).current_tree())
+        print(f"{'OK' if valid else 'UNGÜLTIG'}\t{args.journal}")
+        return 0 if valid else 1
+    files = args.files or [manager.get_latest_xml_file()]
+    invalid = 0
+    for file_path in files:
+        if not os.path.exists(file_path):
+            print(f"FEHLT\t{file_path}")
+            invalid += 1
+            continue
+        try:
+            valid = manager.validate_xml(file_path)
+        except (ET.ParseError, OSError) as e:
+            # Kein wohlgeformtes XML oder nicht lesbar
+            print(f"UNGÜLTIG\t{file_path}\t{e}")
+            invalid += 1
+            continue
+        print(f"{'OK' if valid else 'UNGÜLTIG'}\t{file_path}")
+        invalid += not valid
+    return 1 if invalid else 0
+
+
+def cmd_import(args):
+    from product_xml import read_product_records
+    manager = get_manager(args)
+    if manager.store is not None and args.file.lower().endswith(".xml"):
+        # Vorhandenen XML-Katalog in einer Transaktion übernehmen
+        if not manager.validate_xml(args.file):
+            print(f"UNGÜLTIG\t{args.file}")
+            return 1
+        count = manager.store.import_xml(args.file)
+        print(f"{count} neue Produkte aus {args.file} importiert.")
+        return 0
+    try:
+        results, new_file_path = manager.add_products_bulk(read_product_records(args.file))
+    except ValueError as e:
+        print(e)
+        return 1
+    for result in results:
+        if result["status"] != "added":
+            print(f"{result['index']}\t{result['name']}\t{result['status']}\t{result.get('message', '')}")
+    return 1 if any(result["status"] == "invalid" for result in results) else 0
+
+
+def cmd_export(args):
+    manager = get_manager(args)
+    if manager.store is not None:
+        try:
+            manager.export_store(args.target)
+        except ValueError as e:
+            print(e)
+            return 1
+        return 0
+    if args.journal:
+        get_journal(args, manager).export(args.target, args.version)
+        print(f"Katalog exportiert nach: {args.target}")
+        return 0
+    file_path = catalog_file(args, manager)
+    if file_path is None:
+        return 1
+    manager.export_file(file_path, args.target)
+    print(f"Katalog exportiert nach: {args.target}")
+    return 0
+
+
+def cmd_audit(args):
+    import time
+    from catalog_audit import audit_files, find_catalog_files
+    files = args.files or find_catalog_files()
+    start = time.perf_counter()
+    results = audit_files(files, args.xsd, args.workers)
+    seconds = time.perf_counter() - start
+    invalid = 0
+    for result in results:
+        problems = []
+        if result["error"]:
+            problems.append(f"nicht lesbar: {result['error']}")
+        elif not result["valid"]:
+            problems.append("entspricht nicht dem XSD-Schema")
+        if result["duplicates"]:
+            problems.append(f"doppelte Namen: {', '.join(result['duplicates'])}")
+        if result["empty_workplans"]:
+            problems.append(f"leere Arbeitspläne: {', '.join(result['empty_workplans'])}")
+        invalid += not result["valid"]
+        if problems:
+            print(f"{os.path.basename(result['file'])}\t{'; '.join(problems)}")
+    print(f"{len(results)} Dateien geprüft in {seconds:.2f} s, {invalid} ungültig, "
+          f"{sum(1 for r in results if r['duplicates'])} mit doppelten Namen, "
+          f"{sum(1 for r in results if r['empty_workplans'])} mit leeren Arbeitsplänen.")
+    return 1 if invalid else 0
+
+
+def cmd_diff(args):
+    import xml.etree.ElementTree as ET
+    from catalog_diff import diff_catalogs
+    try:
+        diff = diff_catalogs(args.base, args.other)
+    except (ET.ParseError, OSError) as e:
+        print(file_error(e, args.base, args.other))
+        return 1
+    for marker, key in (("+", "added"), ("-", "removed"), ("~", "changed")):
+        for name in diff[key]:
+            print(f"{marker} {name}")
+    return 1 if any(diff.values()) else 0
+
+
+def cmd_merge(args):
+    import xml.etree.ElementTree as ET
+    from catalog_diff import MergeConflict, merge_catalogs
+    manager = get_manager(args)
+    try:
+        diff, _ = merge_catalogs(args.base, args.other, args.target, args.policy, manager)
+    except (MergeConflict, ValueError) as e:
+        print(e)
+        return 1
+    except (ET.ParseError, OSError) as e:
+        print(file_error(e, args.base, args.other))
+        return 1
+    print(f"{len(diff['added'])} neu, {len(diff['changed'])} abweichend ({args.policy}), "
+          f"zusammengeführt nach: {args.target}")
+    return 0
+
+
+def cmd_simulate(args):
+    import json
+    import xml.etree.ElementTree as ET
+    from line_simulator import format_report, load_profile, read_orders, simulate_catalog
+    manager = get_manager(args)
+    file_path = catalog_file(args, manager)
+    if file_path is None:
+        return 1
+    try:
+        report = simulate_catalog(file_path, read_orders(args.orders),
+                                  load_profile(args.profile))
+    except ValueError as e:
+        print(e)
+        return 1
+    except (ET.ParseError, OSError) as e:
+        print(file_error(e, file_path))
+        return 1
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+def cmd_schedule(args):
+    import json
+    import xml.etree.ElementTree as ET
+    from line_simulator import load_profile, read_orders
+    from order_scheduler import format_schedule_report, schedule_catalog, write_schedule
+    manager = get_manager(args)
+    file_path = catalog_file(args, manager)
+    if file_path is None:
+        return 1
+    try:
+        blocks, report = schedule_catalog(file_path, read_orders(args.orders),
+                                          load_profile(args.profile), args.objective)
+        write_schedule(args.output, blocks)
+    except ValueError as e:
+        print(e)
+        return 1
+    except (ET.ParseError, OSError) as e:
+        print(file_error(e, file_path))
+        return 1
+    print(format_schedule_report(report))
+    print(f"Ablaufplan: {args.output}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+def cmd_deploy(args):
+    manager = get_manager(args)
+    try:
+        if args.journal:
+            entry = manager.deploy(args.target, tree=get_journal(args, manager).current_tree(),
+                                   source_name=os.path.basename(os.path.abspath(args.journal)))
+        else:
+            entry = manager.deploy(args.target)
+    except ValueError as e:
+        print(e)
+        return 2
+    if entry["status"] == "unchanged":
+        print(f"Unverändert, nichts geschrieben: {entry['target']}")
+    else:
+        print(f"Katalog {entry['source']} übernommen nach: {entry['target']}")
+    return 0
+
+
+def cmd_checkpoint(args):
+    if not args.journal:
+        print("Für checkpoint muss --journal angegeben werden.")
+        return 2
+    get_journal(args, get_manager(args)).checkpoint()
+    return 0
+
+
+def measure_startup(code, runs):
+    """Startet einen neuen Interpreter runs-mal und gibt die Zeiten in ms zurück."""
+    import subprocess
+    import time
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], cwd=base_dir,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode != 0:
+            return None
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)
+
+
+def cmd_startup(args):
+    candidates = [
+        ("Python (leer)", "pass"),
+        ("quickload_cli", "import quickload_cli"),
+        ("product_xml", "import product_xml"),
+        ("QuickLoad (PyQt6)", "import QuickLoad"),
+    ]
+    for label, code in candidates:
+        times = measure_startup(code, args.runs)
+        if times is None:
+            print(f"{label:<20} nicht startbar (fehlende Abhängigkeit?)")
+            continue
+        print(f"{label:<20} min {times[0]:7.1f} ms   median {times[len(times) // 2]:7.1f} ms")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Produktkatalog der Industrie 4.0 Anlage (ohne GUI)")
+    parser.add_argument("-C", "--dir", help="Arbeitsverzeichnis mit den products-*.xml Dateien")
+    parser.add_argument("--xsd", default="products.xsd", help="XSD-Schema (Standard: products.xsd)")
+    parser.add_argument("--validation", choices=["incremental", "full"], default="incremental",
+                        help="Nach dem Speichern nur neue Produkte (Standard) oder das ganze Dokument prüfen")
+    # Speicherarten des Katalogs, höchstens eine davon
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--streaming", action="store_true",
+                       help="Katalog per iterparse verarbeiten statt komplett zu laden (große Dateien)")
+    modes.add_argument("--compact", action="store_true",
+                       help="Katalog als kompaktes Modell statt als ElementTree laden (wenig Speicher)")
+    modes.add_argument("--journal", metavar="DIR",
+                       help="Änderungsjournal mit Checkpoints statt vollständigem Snapshot pro Änderung")
+    modes.add_argument("--store", metavar="DB",
+                       help="Produkte in dieser SQLite-Datenbank verwalten; XML nur per export erzeugen")
+    parser.add_argument("--checkpoint-interval", type=int, default=100,
+                        help="Checkpoint nach so vielen Journal-Einträgen (Standard: 100)")
+    parser.add_argument("--metrics-log", action="store_true",
+                        help="Pro Operation eine JSON-Logzeile mit Phasenzeiten und Zählern ausgeben")
+    parser.add_argument("--metrics-file", metavar="PFAD",
+                        help="Messwerte im Prometheus-Textformat in diese Datei schreiben")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("add", help="Produkt hinzufügen")
+    p.add_argument("name")
+    p.add_argument("description")
+    p.add_argument("steps", help='Schritte, z.B. "RR|MC|SI" oder "RB CC:1 SN"')
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("list", help="Produkte auflisten")
+    p.add_argument("--file", help="Katalogdatei (Standard: aktueller Stand)")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("search", help="Produkte nach Namensanfang, Funktionscodes und Beschreibung suchen")
+    p.add_argument("--name", help="Anfang des Produktnamens (ohne Groß-/Kleinschreibung)")
+    p.add_argument("--function", action="append", default=[], metavar="CODE",
+                   help="Funktionscode im Arbeitsplan, mehrfach möglich (alle müssen vorkommen)")
+    p.add_argument("--text", help="Wörter aus der Produktbeschreibung (alle müssen vorkommen)")
+    p.add_argument("--limit", type=int, help="Höchstens so viele Treffer ausgeben")
+    p.add_argument("--file", help="Katalogdatei (Standard: aktueller Stand)")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("check", help="Kataloge gegen das XSD-Schema prüfen")
+    p.add_argument("files", nargs="*")
+    p.set_defaults(func=cmd_check)
+
+    p = sub.add_parser("import", help="Produkte aus CSV/JSON (mit --store auch XML) importieren")
+    p.add_argument("file")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("export", help="Aktuellen Katalog in eine Datei schreiben")
+    p.add_argument("target")
+    p.add_argument("--file", help="Katalogdatei (Standard: aktueller Stand)")
+    p.add_argument("--version", type=int, help="Stand aus dem Journal (Sequenznummer, nur mit --journal)")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("audit", help="Alle products*.xml parallel prüfen (Schema, doppelte Namen, leere Arbeitspläne)")
+    p.add_argument("files", nargs="*")
+    p.add_argument("--workers", type=int, help="Anzahl Prozesse (Standard: ein Prozess pro Kern)")
+    p.set_defaults(func=cmd_audit)
+
+    p = sub.add_parser("diff", help="Unterschiede zweier Katalogdateien auf Produktebene anzeigen")
+    p.add_argument("base")
+    p.add_argument("other")
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser("merge", help="Zwei Katalogdateien zusammenführen")
+    p.add_argument("base")
+    p.add_argument("other")
+    p.add_argument("target")
+    p.add_argument("--policy", choices=["fail", "ours", "theirs", "both"], default="fail",
+                   help="Gleichnamige Produkte mit anderem Arbeitsplan: abbrechen (Standard), "
+                        "base behalten, other übernehmen oder beide behalten")
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("simulate", help="Durchsatz der Anlage für eine Auftragsliste simulieren")
+    p.add_argument("orders", help="Aufträge als CSV/JSON (name, quantity)")
+    p.add_argument("--profile", help="Zeitprofil der Stationen als JSON (Standard: angenommene Zeiten)")
+    p.add_argument("--file", help="Katalogdatei (Standard: aktueller Stand)")
+    p.add_argument("--json", metavar="PFAD", help="Bericht zusätzlich als JSON speichern")
+    p.set_defaults(func=cmd_simulate)
+
+    p = sub.add_parser("schedule", help="Auftragsreihenfolge mit möglichst wenigen Umrüstungen planen")
+    p.add_argument("orders", help="Aufträge als CSV/JSON (name, quantity)")
+    p.add_argument("output", help="Ablaufplan als CSV (position;name;quantity)")
+    p.add_argument("--objective", choices=["changeovers", "makespan"], default="changeovers",
+                   help="Planungsziel: wenigste Umrüstzeit (Standard) oder kürzeste Dauer")
+    p.add_argument("--profile", help="Zeitprofil der Stationen als JSON (Standard: angenommene Zeiten)")
+    p.add_argument("--file", help="Katalogdatei (Standard: aktueller Stand)")
+    p.add_argument("--json", metavar="PFAD", help="Bericht zusätzlich als JSON speichern")
+    p.set_defaults(func=cmd_schedule)
+
+    p = sub.add_parser("deploy", help="Aktuellen Stand als products.xml in den MiniMES-Settings-Ordner übernehmen")
+    p.add_argument("--target", help="Zielordner (Standard: $QUICKLOAD_DEPLOY_DIR)")
+    p.set_defaults(func=cmd_deploy)
+
+    p = sub.add_parser("checkpoint", help="Vollständigen Checkpoint des Journals schreiben")
+    p.set_defaults(func=cmd_checkpoint)
+
+    p = sub.add_parser("startup", help="Startzeit der CLI mit der GUI vergleichen")
+    p.add_argument("--runs", type=int, default=5)
+    p.set_defaults(func=cmd_startup)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.dir:
+        os.chdir(args.dir)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())